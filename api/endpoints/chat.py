@@ -1,14 +1,20 @@
 # api/endpoints/chat.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from schemas.chat import UserProfile, ChatMessage, ChatMessageRequest
-from processors.text_processor import TextProcessor
-from typing import Union, Dict, Any
+from services.container import service
+from typing import TYPE_CHECKING, Union, Dict, Any, Optional
+
+if TYPE_CHECKING:
+    from processors.text_processor import TextProcessor
+
 router = APIRouter()
-processor = TextProcessor()
 
 @router.post("/chat/initialize")
-async def initialize_chat(user_profile: UserProfile):
+async def initialize_chat(
+    user_profile: UserProfile,
+    processor: "TextProcessor" = Depends(service("text_processor"))
+):
     """Initialize a new chat session with user profile"""
     try:
         session_id = await processor.initialize_session(user_profile)
@@ -19,11 +25,16 @@ async def initialize_chat(user_profile: UserProfile):
 @router.post("/chat/{session_id}/stream")
 async def stream_chat(
     session_id: str, 
-    chat_request: ChatMessageRequest
+    chat_request: ChatMessageRequest,
+    processor: "TextProcessor" = Depends(service("text_processor"))
 ):
     """Stream chat responses"""
     return StreamingResponse(
-        processor.chat_stream(session_id, chat_request.message),
+        processor.chat_stream(
+            session_id,
+            chat_request.message,
+            bypass_cache=chat_request.bypass_cache
+        ),
         media_type="text/event-stream",
         headers={
             'Cache-Control': 'no-cache',
@@ -37,10 +48,26 @@ async def stream_chat(
 
 
 @router.get("/chat/{session_id}/history")
-async def get_chat_history(session_id: str):
-    """Get chat history for a session"""
+async def get_chat_history(
+    session_id: str,
+    limit: int = Query(50, ge=1, le=200, description="Number of messages to return"),
+    before: Optional[str] = Query(None, description="Cursor from a previous page to load older messages"),
+    processor: "TextProcessor" = Depends(service("text_processor"))
+):
+    """Get a page of chat history for a session, most recent messages first"""
+    # Cursors are nanosecond sequence numbers, sent as strings so JavaScript
+    # clients don't lose precision parsing them
+    if before is not None and not before.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     try:
-        history = await processor.get_chat_history(session_id)
-        return {"history": [msg.dict() for msg in history]}
+        history, next_cursor = await processor.get_chat_history(
+            session_id,
+            limit,
+            int(before) if before is not None else None
+        )
+        return {
+            "history": [msg.dict() for msg in history],
+            "next_cursor": str(next_cursor) if next_cursor is not None else None
+        }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,35 @@
+from typing import TYPE_CHECKING, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from schemas.product import ProductSearchResponse
+from services.container import service
+
+if TYPE_CHECKING:
+    from services.product_search import ProductSearchEngine
+
+router = APIRouter()
+
+@router.get("/products/search", response_model=ProductSearchResponse)
+async def search_products(
+    q: str = Query(..., min_length=1, description="Search query"),
+    limit: int = Query(10, ge=1, le=50, description="Number of products to return"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
+    min_rating: Optional[float] = Query(None, ge=0, le=5, description="Minimum rating"),
+    brand: Optional[str] = Query(None, description="Only products of this brand (case-insensitive)"),
+    mode: str = Query("hybrid", pattern="^(hybrid|lexical|semantic)$", description="Ranking to use"),
+    product_search: "ProductSearchEngine" = Depends(service("product_search"))
+):
+    """Search the local product catalog with fused full-text and semantic ranking"""
+    try:
+        return await product_search.search(
+            q,
+            limit=limit,
+            min_price=min_price,
+            max_price=max_price,
+            min_rating=min_rating,
+            brand=brand,
+            mode=mode
+        )
+    except Exception as e:
+        print(f"Error in product search endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
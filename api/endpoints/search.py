@@ -1,17 +1,20 @@
-from typing import Optional, Dict, List
-from fastapi import APIRouter, Query
+from typing import TYPE_CHECKING, Optional, Dict, List
+from fastapi import APIRouter, Depends, Query
 from schemas.search import SearchResponse
-from services.search_api import SourceExtractorService
+from services.container import service
 from core.config import BRAVE_SEARCH_API_KEY
 
+if TYPE_CHECKING:
+    from services.search_api import SourceExtractorService
+
 router = APIRouter()
-source_extractor = SourceExtractorService()
 
 @router.get("/search", response_model=SearchResponse)
 async def search(
     q: str = Query(..., description="Search query"),
     country: str = Query("in", description="Country code"),
-    count: int = Query(5, description="Number of results to return")
+    count: int = Query(5, description="Number of results to return"),
+    source_extractor: "SourceExtractorService" = Depends(service("source_extractor"))
 ) -> Dict[str, List]:
     """Search endpoint that returns web and video results from Brave search"""
     try:
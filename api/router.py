@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from api.endpoints import search, query, chat
+from api.endpoints import search, query, chat, products
 
 api_router = APIRouter(prefix="/api")
 
@@ -7,3 +7,4 @@ api_router = APIRouter(prefix="/api")
 api_router.include_router(search.router, tags=["search"])
 # api_router.include_router(query.router, tags=["query"])
 api_router.include_router(chat.router, tags=["chat"])
+api_router.include_router(products.router, tags=["products"])
@@ -5,6 +5,16 @@ load_dotenv()
 
 # APP
 SERVER_PORT = os.getenv("SERVER_PORT", 7600) 
+# "development" runs a single auto-reloading uvicorn, "production" runs gunicorn
+SERVER_MODE = os.getenv("SERVER_MODE", "development")
+# Every worker has its own database pools and extraction processes, so the
+# default stays small; raise it together with POSTGRES_MAX_CONNECTIONS
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 2))
+GUNICORN_PRELOAD = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+GUNICORN_TIMEOUT = int(os.getenv("GUNICORN_TIMEOUT", 120))
+GUNICORN_GRACEFUL_TIMEOUT = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+GUNICORN_KEEPALIVE = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+GUNICORN_MAX_REQUESTS = int(os.getenv("GUNICORN_MAX_REQUESTS", 0))
 
 
 # PostgreSQL
@@ -15,10 +25,25 @@ POSTGRES_HOST = os.getenv("POSTGRES_HOST")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT")
 
 POSTGRES_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+POSTGRES_ASYNC_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+# Connections all workers together may open, below the server's
+# max_connections (100 by default) to leave room for scripts and psql.
+# Each worker has a sync and an async engine, which split its share.
+POSTGRES_MAX_CONNECTIONS = int(os.getenv("POSTGRES_MAX_CONNECTIONS", 80))
+_ENGINE_CONNECTIONS = max(2, POSTGRES_MAX_CONNECTIONS // (2 * max(1, WEB_CONCURRENCY)))
+POSTGRES_POOL_SIZE = int(os.getenv("POSTGRES_POOL_SIZE", min(10, _ENGINE_CONNECTIONS // 2)))
+POSTGRES_MAX_OVERFLOW = int(os.getenv("POSTGRES_MAX_OVERFLOW", _ENGINE_CONNECTIONS - POSTGRES_POOL_SIZE))
+POSTGRES_POOL_TIMEOUT = float(os.getenv("POSTGRES_POOL_TIMEOUT", 30))
+POSTGRES_POOL_RECYCLE = int(os.getenv("POSTGRES_POOL_RECYCLE", 1800))
+POSTGRES_POOL_PRE_PING = os.getenv("POSTGRES_POOL_PRE_PING", "true").lower() == "true"
+# Prepared statements cached per connection; set to 0 behind PgBouncer in transaction mode
+POSTGRES_STATEMENT_CACHE_SIZE = int(os.getenv("POSTGRES_STATEMENT_CACHE_SIZE", 500))
 
 # Qdrant
 QDRANT_HOST = os.getenv("QDRANT_HOST")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", 6333))
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", 6334))
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
 
 # Models
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
@@ -27,3 +52,98 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # SEARCH_API
 BRAVE_SEARCH_API_KEY = os.getenv("BRAVE_SEARCH_API_KEY")
+
+# HTTP client
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", 100))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", 10))
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", 300))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", 30))
+HTTP_REQUEST_TIMEOUT = float(os.getenv("HTTP_REQUEST_TIMEOUT", 15))
+
+# Source extraction
+SOURCE_FETCH_CONCURRENCY = int(os.getenv("SOURCE_FETCH_CONCURRENCY", 5))
+SOURCE_FETCH_DEADLINE = float(os.getenv("SOURCE_FETCH_DEADLINE", 6))
+
+# Search result cache
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 900))
+SEARCH_CACHE_STALE_TTL = float(os.getenv("SEARCH_CACHE_STALE_TTL", 3600))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 1024))
+
+# Extracted content cache
+CONTENT_CACHE_PATH = os.getenv("CONTENT_CACHE_PATH", "storage/cache/content_cache.db")
+CONTENT_CACHE_MAX_BYTES = int(os.getenv("CONTENT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+CONTENT_CACHE_TTL = float(os.getenv("CONTENT_CACHE_TTL", 6 * 3600))
+
+# Content extraction process pool
+# Per web worker; the default shares the cores between them
+EXTRACTION_WORKERS = int(os.getenv(
+    "EXTRACTION_WORKERS",
+    max(1, min(4, (os.cpu_count() or 1) // max(1, WEB_CONCURRENCY)))
+))
+EXTRACTION_MAX_HTML_CHARS = int(os.getenv("EXTRACTION_MAX_HTML_CHARS", 2_000_000))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", 10))
+
+# Prompt context
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 1500))
+CONTEXT_PASSAGE_CHARS = int(os.getenv("CONTEXT_PASSAGE_CHARS", 800))
+
+# Embedding cache
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "storage/cache/embedding_cache.db")
+EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", 4096))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 200_000))
+
+# Embedding batching
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", 10))
+
+# Conversation memory
+CONVERSATION_MEMORY_MAX_BYTES = int(os.getenv("CONVERSATION_MEMORY_MAX_BYTES", 64 * 1024 * 1024))
+CONVERSATION_MEMORY_IDLE_TTL = float(os.getenv("CONVERSATION_MEMORY_IDLE_TTL", 1800))
+# "qdrant" is shared by every worker, "memory" only works with a single worker
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "qdrant")
+
+# Conversation summarization
+HISTORY_SUMMARY_TOKEN_THRESHOLD = int(os.getenv("HISTORY_SUMMARY_TOKEN_THRESHOLD", 2000))
+HISTORY_KEEP_LAST_TURNS = int(os.getenv("HISTORY_KEEP_LAST_TURNS", 4))
+
+# Response streaming
+STREAM_FLUSH_POLICY = os.getenv("STREAM_FLUSH_POLICY", "sentence")
+STREAM_FLUSH_INTERVAL_MS = float(os.getenv("STREAM_FLUSH_INTERVAL_MS", 50))
+STREAM_MAX_BUFFER_CHARS = int(os.getenv("STREAM_MAX_BUFFER_CHARS", 150))
+
+# LLM clients
+LLM_POOL_LIMIT = int(os.getenv("LLM_POOL_LIMIT", 50))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", 60))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", 60))
+
+# Retrieval gate
+RETRIEVAL_GATE_ENABLED = os.getenv("RETRIEVAL_GATE_ENABLED", "true").lower() == "true"
+# 0.5 retrieves for everything but small talk and questions about the
+# conversation itself; raise it to also skip messages without lookup terms
+RETRIEVAL_GATE_THRESHOLD = float(os.getenv("RETRIEVAL_GATE_THRESHOLD", 0.5))
+
+# Semantic answer cache
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.92))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", 24 * 3600))
+
+# Product search
+PRODUCT_SEARCH_COLLECTION = os.getenv("PRODUCT_SEARCH_COLLECTION", "products")
+PRODUCT_SEARCH_CANDIDATES = int(os.getenv("PRODUCT_SEARCH_CANDIDATES", 50))
+PRODUCT_SEARCH_RRF_K = int(os.getenv("PRODUCT_SEARCH_RRF_K", 60))
+
+# NL-to-SQL
+SQL_STATEMENT_TIMEOUT_MS = int(os.getenv("SQL_STATEMENT_TIMEOUT_MS", 3000))
+SQL_QUERY_CACHE_TTL = float(os.getenv("SQL_QUERY_CACHE_TTL", 24 * 3600))
+SQL_QUERY_CACHE_MAX_ENTRIES = int(os.getenv("SQL_QUERY_CACHE_MAX_ENTRIES", 1024))
+SQL_RESULT_CACHE_TTL = float(os.getenv("SQL_RESULT_CACHE_TTL", 600))
+SQL_RESULT_CACHE_MAX_ENTRIES = int(os.getenv("SQL_RESULT_CACHE_MAX_ENTRIES", 512))
+SQL_CATALOG_VERSION_TTL = float(os.getenv("SQL_CATALOG_VERSION_TTL", 1))
+
+# Bulk product loading
+BULK_LOAD_BATCH_SIZE = int(os.getenv("BULK_LOAD_BATCH_SIZE", 5000))
+
+# Health checks
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", 10))
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", 2))
+HEALTH_MAX_STALENESS = float(os.getenv("HEALTH_MAX_STALENESS", 30))
@@ -0,0 +1,78 @@
+# gunicorn.conf.py
+"""Production server: gunicorn managing uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Any worker can serve any chat turn because sessions and history live in
+the shared session store (SESSION_STORE_BACKEND=qdrant).
+
+Graceful reload: `kill -HUP <master pid>` starts fresh workers and lets the
+old ones finish in-flight requests (up to GUNICORN_GRACEFUL_TIMEOUT). With
+GUNICORN_PRELOAD the app is imported once in the master and shared by the
+forked workers, so HUP reuses that code; deploy new code with
+`kill -USR2` (new master) followed by `kill -WINCH` / `-TERM` on the old one,
+or by restarting the container.
+
+Resources multiply with the worker count. Each worker opens up to
+(POSTGRES_POOL_SIZE + POSTGRES_MAX_OVERFLOW) connections on each of its two
+engines and runs EXTRACTION_WORKERS extraction processes, so the totals are
+
+    postgres connections = WEB_CONCURRENCY * 2 * (pool size + overflow)
+    processes            = WEB_CONCURRENCY * (1 + EXTRACTION_WORKERS)
+
+The pool defaults are derived from POSTGRES_MAX_CONNECTIONS so the first
+stays within that budget; raise it only as far as the server's
+max_connections allows.
+"""
+from core.config import (
+    SERVER_PORT,
+    WEB_CONCURRENCY,
+    GUNICORN_PRELOAD,
+    GUNICORN_TIMEOUT,
+    GUNICORN_GRACEFUL_TIMEOUT,
+    GUNICORN_KEEPALIVE,
+    GUNICORN_MAX_REQUESTS,
+    SESSION_STORE_BACKEND
+)
+
+if WEB_CONCURRENCY > 1 and SESSION_STORE_BACKEND == "memory":
+    raise RuntimeError(
+        "SESSION_STORE_BACKEND=memory keeps sessions inside one process; "
+        "use the qdrant backend or WEB_CONCURRENCY=1"
+    )
+
+bind = f"0.0.0.0:{SERVER_PORT}"
+workers = WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = GUNICORN_PRELOAD
+# Streamed answers can take a while; the timeout only applies to silent workers
+timeout = GUNICORN_TIMEOUT
+graceful_timeout = GUNICORN_GRACEFUL_TIMEOUT
+keepalive = GUNICORN_KEEPALIVE
+max_requests = GUNICORN_MAX_REQUESTS
+max_requests_jitter = GUNICORN_MAX_REQUESTS // 10
+accesslog = "-"
+errorlog = "-"
+
+# Heavy libraries the services import lazily; with preload they are imported
+# once in the master so workers share the pages instead of each paying for them
+PRELOAD_MODULES = (
+    "processors.text_processor",
+    "services.search_api",
+    "services.product_search"
+)
+
+def when_ready(server):
+    if not preload_app:
+        return
+    import importlib
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            server.log.warning(f"Could not preload {module}: {str(e)}")
+
+def post_fork(server, worker):
+    # Never share pooled connections opened in the master with a worker
+    from services.postgres import engine
+    engine.dispose(close=False)
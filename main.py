@@ -1,18 +1,101 @@
 # main.py
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+import asyncio
 import uvicorn
 
-from services.postgres import get_db, engine
-from services.qdrant import get_qdrant_client, init_collection
+from services.postgres import engine, close_engines
+from services.qdrant import get_async_qdrant_client, init_collection, close_qdrant_clients
+from services.http_client import init_http_session, close_http_session
+from services.extraction import extraction_engine
+from services.search_api import search_cache
+from services.llm_clients import llm_clients
+from services.session_store import get_session_store
+from services.answer_cache import SemanticAnswerCache
+from services.container import build_services
+from services.health import create_health_checker
 from api.router import api_router
-from core.config import SERVER_PORT
-from models.product import Base
-from utils.data_loader import load_products
+from core.config import SERVER_PORT, SERVER_MODE
+from services.migrations import run_migrations
+from utils.bulk_loader import seed_products
 
-app = FastAPI()
+async def startup():
+    """Initialize database and Qdrant collections before serving traffic"""
+    # Shared outbound HTTP connection pool
+    await init_http_session()
+
+    # Bring the database schema up to date
+    await asyncio.to_thread(run_migrations, engine)
+
+    # Load initial data if table is empty; COPY runs through psycopg2, off
+    # the event loop, and only in the worker that gets the lock first
+    if await asyncio.to_thread(seed_products, engine, "datasets/product.json") is not None:
+        print("Successfully loaded product data")
+    print("Database initialization completed")
+
+    # Initialize Qdrant collection for chat
+    try:
+        # Initialize collection for beauty consultations
+        await init_collection(
+            collection_name="beauty_consultations",
+            vector_size=1536  # OpenAI embeddings dimension
+        )
+        # Session and message history storage shared by all workers
+        await get_session_store().init()
+        # Semantic answer cache, dropping entries that expired while down
+        answer_cache = SemanticAnswerCache(get_async_qdrant_client())
+        await answer_cache.init()
+        await answer_cache.purge_expired()
+        print("Successfully initialized Qdrant collection")
+    except Exception as e:
+        print(f"Error initializing Qdrant collection: {e}")
+        raise e
+
+async def warm_up(app: FastAPI):
+    """Build the heavy services once the app is already accepting requests"""
+    # Spawn and warm the trafilatura worker processes
+    try:
+        await extraction_engine.start()
+    except Exception as e:
+        print(f"Error starting extraction workers: {str(e)}")
+    # Chat processor, web search and hybrid product search
+    await app.state.services.warm_up()
+
+async def shutdown():
+    """Release shared resources on shutdown"""
+    await close_http_session()
+    await extraction_engine.shutdown()
+    await llm_clients.close()
+    await close_qdrant_clients()
+    await close_engines()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.services = build_services()
+    app.state.health = create_health_checker()
+    try:
+        await startup()
+    except Exception as e:
+        print(f"Error during startup: {e}")
+        await shutdown()
+        raise
+    # First round runs before traffic so /readyz has an answer right away
+    await app.state.health.refresh()
+    app.state.health.start()
+    warm_up_task = asyncio.create_task(warm_up(app))
+    try:
+        yield
+    finally:
+        warm_up_task.cancel()
+        try:
+            await warm_up_task
+        except asyncio.CancelledError:
+            pass
+        await app.state.health.stop()
+        await shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 # origins = [
 #     "http://localhost:3000",     # React development server
@@ -37,77 +120,51 @@ app.add_middleware(
 # Include the API router
 app.include_router(api_router)
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database and Qdrant collections on startup"""
-    try:
-        # Create database tables
-        Base.metadata.create_all(bind=engine)
-        
-        # Load initial data if table is empty
-        db = next(get_db())
-        result = db.execute(text("SELECT COUNT(*) FROM products")).scalar()
-        if result == 0:
-            load_products(db, "datasets/product.json")
-            print("Successfully loaded product data")
-        db.close()
-        print("Database initialization completed")
-
-        # Initialize Qdrant collection for chat
-        try:
-            # Initialize collection for beauty consultations
-            init_collection(
-                collection_name="beauty_consultations",
-                vector_size=1536  # OpenAI embeddings dimension
-            )
-            print("Successfully initialized Qdrant collection")
-        except Exception as e:
-            print(f"Error initializing Qdrant collection: {e}")
-            raise e
+@app.get("/livez")
+async def livez():
+    """Liveness: the process is up and serving; touches no dependency"""
+    return {"status": "alive"}
 
-    except Exception as e:
-        print(f"Error during startup: {e}")
-        raise e
+@app.get("/readyz")
+async def readyz(request: Request):
+    """Readiness from the background checker's last result; never does I/O itself"""
+    readiness = request.app.state.health.snapshot()
+    if readiness["status"] != "ready":
+        raise HTTPException(status_code=503, detail=readiness)
+    return readiness
 
 @app.get("/healthz")
-async def healthz(db: Session = Depends(get_db)):
+async def healthz(request: Request):
+    """Detailed status: fresh dependency checks with their latency, plus service warm-up"""
+    health = request.app.state.health
+    results = await health.refresh()
     health_status = {
-        "status": "healthy",
+        "status": "healthy" if health.is_ready() else "unhealthy",
         "version": "v0.1.0",
-        "services": {
-            "postgres": "unhealthy",
-            "qdrant": "unhealthy"
+        "services": results,
+        "components": request.app.state.services.stats(),
+        "caches": {
+            "search": search_cache.stats(),
+            "llm_clients": llm_clients.stats()
         }
     }
 
-    try:
-        # Check PostgreSQL connection
-        db.execute(text("SELECT 1"))
-        health_status["services"]["postgres"] = "healthy"
-    except Exception as e:
-        health_status["status"] = "unhealthy"
-        health_status["services"]["postgres"] = str(e)
-
-    try:
-        # Check Qdrant connection
-        qdrant_client = get_qdrant_client()
-        collections = qdrant_client.get_collections()
-        health_status["services"]["qdrant"] = "healthy"
-        
-        # Verify beauty_consultations collection exists
-        if not any(col.name == "beauty_consultations" for col in collections.collections):
-            health_status["status"] = "unhealthy"
-            health_status["services"]["qdrant"] = "beauty_consultations collection missing"
-    except Exception as e:
-        health_status["status"] = "unhealthy"
-        health_status["services"]["qdrant"] = str(e)
-
     if health_status["status"] == "unhealthy":
         raise HTTPException(status_code=503, detail=health_status)
 
     return health_status
 
+def run_production():
+    """gunicorn with uvicorn workers, configured in gunicorn.conf.py"""
+    import sys
+    from gunicorn.app.wsgiapp import run
+    sys.argv = ["gunicorn", "-c", "gunicorn.conf.py", "main:app"]
+    # Exits when the master stops
+    run()
+
 if __name__ == "__main__":
+    if SERVER_MODE == "production":
+        run_production()
     try:
         uvicorn.run(
             "main:app",
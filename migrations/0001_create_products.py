@@ -0,0 +1,20 @@
+# migrations/0001_create_products.py
+"""Create the products table (adopts tables created by the old create_all)"""
+from sqlalchemy import text
+
+def upgrade(connection):
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS products (
+            id SERIAL PRIMARY KEY,
+            product_name VARCHAR(255),
+            price VARCHAR(50),
+            price_value DOUBLE PRECISION,
+            rating DOUBLE PRECISION,
+            description TEXT,
+            link VARCHAR(512)
+        )
+    """))
+    connection.execute(text("CREATE INDEX IF NOT EXISTS ix_products_id ON products (id)"))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_products_product_name ON products (product_name)"
+    ))
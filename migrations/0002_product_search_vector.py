@@ -0,0 +1,19 @@
+# migrations/0002_product_search_vector.py
+"""Generated full-text search column for hybrid product search"""
+from sqlalchemy import text
+from services.migrations import create_index_concurrently
+
+# Indexes are built concurrently so a live table keeps taking writes
+TRANSACTIONAL = False
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(product_name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')"
+)
+
+def upgrade(connection):
+    connection.execute(text(
+        "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED"
+    ))
+    create_index_concurrently(connection, "ix_products_search_vector", "ON products USING GIN (search_vector)")
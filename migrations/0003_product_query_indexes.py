@@ -0,0 +1,18 @@
+# migrations/0003_product_query_indexes.py
+"""Trigram indexes for ILIKE '%x%' on name/description, B-trees for sorting and ranges"""
+from sqlalchemy import text
+from services.migrations import create_index_concurrently
+
+# Indexes are built concurrently so a live table keeps taking writes
+TRANSACTIONAL = False
+
+def upgrade(connection):
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    create_index_concurrently(
+        connection, "ix_products_product_name_trgm", "ON products USING GIN (product_name gin_trgm_ops)"
+    )
+    create_index_concurrently(
+        connection, "ix_products_description_trgm", "ON products USING GIN (description gin_trgm_ops)"
+    )
+    create_index_concurrently(connection, "ix_products_price_value", "ON products (price_value)")
+    create_index_concurrently(connection, "ix_products_rating", "ON products (rating)")
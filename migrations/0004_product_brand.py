@@ -0,0 +1,40 @@
+# migrations/0004_product_brand.py
+"""Typed brand column, backfilled from product names, for brand filters"""
+from sqlalchemy import text
+from services.migrations import create_index_concurrently
+
+# Indexes are built concurrently so a live table keeps taking writes
+TRANSACTIONAL = False
+
+# Frozen copy of utils.data_loader's brand list and extraction as of this
+# migration, so replaying it on a new database always gives the same data
+KNOWN_BRANDS = [
+    "IYKYK by Nykaa Fashion", "Nykaa Naturals", "Nykaa Fashion", "The Ordinary", "The Face Shop",
+    "The Derma Co", "Dot & Key", "Tom Ford", "Twenty Dresses", "Marc Loire", "House of Vian",
+    "Coral Haze", "Himalaya Herbals", "Lotus Professional", "Nature's Essence", "Lacto Calamine"
+]
+
+def extract_brand(product_name: str) -> str:
+    name = (product_name or "").strip()
+    lowered = name.lower()
+    for brand in sorted(KNOWN_BRANDS, key=len, reverse=True):
+        if lowered.startswith(brand.lower()):
+            return brand
+    words = name.split()
+    if not words:
+        return ""
+    if words[0].lower() == "the" and len(words) > 1:
+        return f"{words[0]} {words[1]}".rstrip(".")
+    return words[0].rstrip(".")
+
+def upgrade(connection):
+    connection.execute(text("ALTER TABLE products ADD COLUMN IF NOT EXISTS brand VARCHAR(100)"))
+    rows = connection.execute(text(
+        "SELECT id, product_name FROM products WHERE brand IS NULL"
+    )).fetchall()
+    if rows:
+        connection.execute(
+            text("UPDATE products SET brand = :brand WHERE id = :id"),
+            [{"id": row.id, "brand": extract_brand(row.product_name)} for row in rows]
+        )
+    create_index_concurrently(connection, "ix_products_brand", "ON products (lower(brand))")
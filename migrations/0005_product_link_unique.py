@@ -0,0 +1,18 @@
+# migrations/0005_product_link_unique.py
+"""Unique product link, the natural key bulk loads upsert on"""
+from sqlalchemy import text
+from services.migrations import create_index_concurrently
+
+# Indexes are built concurrently so a live table keeps taking writes
+TRANSACTIONAL = False
+
+def upgrade(connection):
+    # Keep the most recently inserted row of any duplicated link
+    connection.execute(text("""
+        DELETE FROM products p
+        USING products newer
+        WHERE p.link = newer.link AND p.id < newer.id
+    """))
+    # Rows inserted between the two statements can still collide; the
+    # build then fails, and the next run dedupes again and rebuilds
+    create_index_concurrently(connection, "ux_products_link", "ON products (link)", unique=True)
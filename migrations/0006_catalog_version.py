@@ -0,0 +1,34 @@
+# migrations/0006_catalog_version.py
+"""Transactional version counter for the products table.
+
+A statement-level trigger bumps the counter in the same transaction as
+every write to products (ORM, COPY upserts, manual SQL, TRUNCATE), so a
+reader sees the new version exactly when it can see the new rows. Query
+result caches are keyed on it.
+"""
+from sqlalchemy import text
+
+def upgrade(connection):
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            table_name VARCHAR(63) PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        )
+    """))
+    connection.execute(text(
+        "INSERT INTO catalog_version (table_name) VALUES ('products') ON CONFLICT DO NOTHING"
+    ))
+    connection.execute(text("""
+        CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE catalog_version SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """))
+    connection.execute(text("DROP TRIGGER IF EXISTS products_catalog_version ON products"))
+    connection.execute(text("""
+        CREATE TRIGGER products_catalog_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON products
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version()
+    """))
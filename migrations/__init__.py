@@ -0,0 +1,8 @@
+# migrations/__init__.py
+"""Numbered database schema migrations.
+
+Each module is named `NNNN_description.py` and defines `upgrade(connection)`,
+which runs inside its own transaction. Applied versions are recorded in the
+`schema_migrations` table by services/migrations.py; never edit a migration
+that has shipped, add a new one instead.
+"""
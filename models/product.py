@@ -1,14 +1,45 @@
 # models/product.py
-from sqlalchemy import Column, Integer, String, Float, Text
+from sqlalchemy import Column, Integer, String, Float, Text, Computed, Index, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from services.postgres import Base
 
+# Weighted full-text document: matches in the name rank above the description
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(product_name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')"
+)
+
 class Product(Base):
     __tablename__ = "products"
+    # The schema itself is created by migrations/ (services/migrations.py);
+    # indexes are declared here so the model documents what exists
+    __table_args__ = (
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_products_product_name_trgm", "product_name",
+            postgresql_using="gin", postgresql_ops={"product_name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_products_description_trgm", "description",
+            postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}
+        ),
+        Index("ix_products_price_value", "price_value"),
+        Index("ix_products_rating", "rating"),
+        Index("ux_products_link", "link", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     product_name = Column(String(255), index=True)
+    brand = Column(String(100))
     price = Column(String(50))  
     price_value = Column(Float)  
     rating = Column(Float)
     description = Column(Text)
-    link = Column(String(512))
\ No newline at end of file
+    link = Column(String(512))
+    # Maintained by Postgres on every insert/update
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
+
+
+# Brand filters compare case-insensitively
+Index("ix_products_brand", func.lower(Product.brand))
@@ -0,0 +1,80 @@
+# processors/agent/compactor.py
+from langchain.schema import SystemMessage, HumanMessage, BaseMessage
+from typing import Any, Awaitable, Callable, Dict, List
+import asyncio
+from utils.tokens import estimate_tokens
+
+SUMMARY_PROMPT = """You maintain a running summary of a beauty consultation between a user and Yara, an AI beauty consultant.
+Update the existing summary with the new conversation turns below. Keep everything needed to continue the
+consultation: the user's questions, stated preferences, concerns, products or routines already recommended
+(with prices when given) and any decisions made. Drop greetings and small talk. Write concise prose, at most
+250 words, and return only the updated summary."""
+
+class HistoryCompactor:
+    """Fold older conversation turns into a running summary.
+
+    Once the unsummarized part of a session's history exceeds
+    `token_threshold` tokens, everything except the last `keep_last_turns`
+    exchanges is summarized by the LLM in a background task and persisted
+    with the session. Prompts then carry the summary plus only the recent
+    turns verbatim.
+    """
+
+    def __init__(
+        self,
+        complete: Callable[[List[BaseMessage]], Awaitable[str]],
+        persist: Callable[[str, str, int], Awaitable[None]],
+        token_threshold: int,
+        keep_last_turns: int
+    ):
+        self.complete = complete
+        self.persist = persist
+        self.token_threshold = token_threshold
+        self.keep_last_messages = keep_last_turns * 2
+        self._running: Dict[str, asyncio.Task] = {}
+
+    def recent_messages(self, messages: List[BaseMessage], summarized_count: int) -> List[BaseMessage]:
+        """Messages not yet folded into the summary"""
+        return messages[summarized_count:]
+
+    def needs_compaction(self, messages: List[BaseMessage], summarized_count: int) -> bool:
+        recent = self.recent_messages(messages, summarized_count)
+        if len(recent) <= self.keep_last_messages:
+            return False
+        return sum(estimate_tokens(m.content) for m in recent) > self.token_threshold
+
+    def schedule(self, session_id: str, messages: List[BaseMessage], payload: Dict[str, Any]):
+        """Start a background compaction for the session if one is due"""
+        summarized_count = payload.get('summarized_count', 0)
+        if session_id in self._running or not self.needs_compaction(messages, summarized_count):
+            return
+        task = asyncio.create_task(
+            self._compact(session_id, list(messages), payload.get('summary', ''), summarized_count)
+        )
+        self._running[session_id] = task
+        task.add_done_callback(lambda _: self._running.pop(session_id, None))
+
+    async def _compact(
+        self,
+        session_id: str,
+        messages: List[BaseMessage],
+        summary: str,
+        summarized_count: int
+    ):
+        fold_until = len(messages) - self.keep_last_messages
+        to_fold = messages[summarized_count:fold_until]
+        transcript = "\n".join(
+            f"{'User' if m.type == 'human' else 'Yara'}: {m.content}" for m in to_fold
+        )
+        try:
+            new_summary = await self.complete([
+                SystemMessage(content=SUMMARY_PROMPT),
+                HumanMessage(content=(
+                    f"Existing summary:\n{summary or '(none yet)'}\n\n"
+                    f"New conversation turns:\n{transcript}"
+                ))
+            ])
+            await self.persist(session_id, new_summary.strip(), fold_until)
+            print(f"Compacted {len(to_fold)} message(s) of session {session_id} into summary")
+        except Exception as e:
+            print(f"Error compacting session {session_id}: {str(e)}")
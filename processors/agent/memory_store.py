@@ -0,0 +1,156 @@
+# processors/agent/memory_store.py
+from langchain_community.chat_message_histories import ChatMessageHistory
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from collections import OrderedDict
+import asyncio
+import sys
+import time
+
+# Rough per-object overhead of a message / history entry beyond its text
+MESSAGE_OVERHEAD_BYTES = 400
+ENTRY_OVERHEAD_BYTES = 1024
+
+HistoryLoader = Callable[[str], Awaitable[List[Dict[str, Any]]]]
+
+class ConversationMemoryStore:
+    """Bounded in-process cache of per-session ChatMessageHistory objects.
+
+    Entries are evicted when idle for longer than `idle_ttl` seconds and,
+    least recently used first, whenever the estimated total size exceeds
+    `max_bytes`. A miss rehydrates the history through `loader` (the
+    durable session store), so eviction never loses conversation state.
+
+    Each entry remembers the seq of the newest message it holds. Passing the
+    session's current `last_seq` to `get` reloads entries that are behind,
+    e.g. because another worker served the previous turn.
+    """
+
+    def __init__(self, max_bytes: int, idle_ttl: float, loader: Optional[HistoryLoader] = None):
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.loader = loader
+        # session_id -> [history, size_bytes, last_access, last_seq]
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lru_evictions = 0
+        self.idle_evictions = 0
+        self.stale_reloads = 0
+
+    @staticmethod
+    def _message_size(content: str) -> int:
+        return sys.getsizeof(content) + MESSAGE_OVERHEAD_BYTES
+
+    def _insert(self, session_id: str, history: ChatMessageHistory, last_seq: Optional[int] = None):
+        size = ENTRY_OVERHEAD_BYTES + sum(self._message_size(m.content) for m in history.messages)
+        self._remove(session_id)
+        self._entries[session_id] = [history, size, time.monotonic(), last_seq]
+        self.total_bytes += size
+        self._evict()
+
+    def _remove(self, session_id: str) -> bool:
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return False
+        self.total_bytes -= entry[1]
+        return True
+
+    def _evict(self):
+        now = time.monotonic()
+        # Entries are kept in access order, so idle ones are at the front
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if now - entry[2] <= self.idle_ttl:
+                break
+            self._remove(session_id)
+            self.idle_evictions += 1
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            session_id = next(iter(self._entries))
+            self._remove(session_id)
+            self.lru_evictions += 1
+
+    def create(self, session_id: str) -> ChatMessageHistory:
+        """Start an empty history for a brand new session"""
+        history = ChatMessageHistory()
+        self._insert(session_id, history)
+        return history
+
+    async def get(self, session_id: str, last_seq: Optional[int] = None) -> ChatMessageHistory:
+        """Return the session's history, rehydrating it from the loader on a miss.
+
+        With `last_seq`, a cached history that doesn't end at that message
+        counts as a miss too.
+        """
+        entry = self._entries.get(session_id)
+        if entry is not None and last_seq is not None and entry[3] != last_seq:
+            self.stale_reloads += 1
+            self._remove(session_id)
+            entry = None
+        if entry is not None:
+            self.hits += 1
+            entry[2] = time.monotonic()
+            self._entries.move_to_end(session_id)
+            self._evict()
+            return entry[0]
+
+        self.misses += 1
+        future = self._inflight.get(session_id)
+        if future is None:
+            future = asyncio.ensure_future(self._load(session_id))
+            self._inflight[session_id] = future
+        return await asyncio.shield(future)
+
+    async def _load(self, session_id: str) -> ChatMessageHistory:
+        try:
+            history = ChatMessageHistory()
+            messages = await self.loader(session_id) if self.loader else []
+            for msg in messages:
+                if msg['role'] == 'user':
+                    history.add_user_message(msg['content'])
+                else:
+                    history.add_ai_message(msg['content'])
+            self._insert(session_id, history, messages[-1].get('seq') if messages else None)
+            return history
+        finally:
+            self._inflight.pop(session_id, None)
+
+    def add_turn(
+        self,
+        session_id: str,
+        user_message: str,
+        ai_response: str,
+        last_seq: Optional[int] = None
+    ):
+        """Record a completed turn if the session is cached.
+
+        Uncached sessions are left alone: the turn is already in the durable
+        store and will be part of the next rehydration.
+        """
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return
+        entry[0].add_user_message(user_message)
+        entry[0].add_ai_message(ai_response)
+        added = self._message_size(user_message) + self._message_size(ai_response)
+        entry[1] += added
+        entry[2] = time.monotonic()
+        entry[3] = last_seq
+        self.total_bytes += added
+        self._entries.move_to_end(session_id)
+        self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "sessions": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "lru_evictions": self.lru_evictions,
+            "idle_evictions": self.idle_evictions,
+            "stale_reloads": self.stale_reloads
+        }
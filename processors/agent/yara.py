@@ -1,19 +1,64 @@
 # processors/agent/yara.py
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.schema import SystemMessage, HumanMessage
+from langchain.schema import SystemMessage, HumanMessage, BaseMessage
 from langchain_community.chat_message_histories import ChatMessageHistory
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from processors.agent.memory_store import ConversationMemoryStore, HistoryLoader
+from processors.agent.compactor import HistoryCompactor
+from core.config import (
+    CONVERSATION_MEMORY_MAX_BYTES,
+    CONVERSATION_MEMORY_IDLE_TTL,
+    HISTORY_SUMMARY_TOKEN_THRESHOLD,
+    HISTORY_KEEP_LAST_TURNS
+)
+import hashlib
 import json
 
 class YaraAgent:
-    def __init__(self):
-        self.message_histories: Dict[str, ChatMessageHistory] = {}
+    def __init__(
+        self,
+        history_loader: Optional[HistoryLoader] = None,
+        complete: Optional[Callable[[List[BaseMessage]], Awaitable[str]]] = None,
+        persist_summary: Optional[Callable[[str, str, int], Awaitable[None]]] = None
+    ):
+        self.message_histories = ConversationMemoryStore(
+            max_bytes=CONVERSATION_MEMORY_MAX_BYTES,
+            idle_ttl=CONVERSATION_MEMORY_IDLE_TTL,
+            loader=history_loader
+        )
+        self.compactor = None
+        if complete and persist_summary:
+            self.compactor = HistoryCompactor(
+                complete=complete,
+                persist=persist_summary,
+                token_threshold=HISTORY_SUMMARY_TOKEN_THRESHOLD,
+                keep_last_turns=HISTORY_KEEP_LAST_TURNS
+            )
 
-    def get_memory(self, session_id: str) -> ChatMessageHistory:
-        """Get or create message history for a session"""
-        if session_id not in self.message_histories:
-            self.message_histories[session_id] = ChatMessageHistory()
-        return self.message_histories[session_id]
+    def create_memory(self, session_id: str) -> ChatMessageHistory:
+        """Create an empty message history for a new session"""
+        return self.message_histories.create(session_id)
+
+    async def get_memory(self, session_id: str, last_seq: Optional[int] = None) -> ChatMessageHistory:
+        """Get message history for a session, rehydrating it from storage if evicted or stale"""
+        return await self.message_histories.get(session_id, last_seq)
+
+    def add_turn(
+        self,
+        session_id: str,
+        user_message: str,
+        ai_response: str,
+        last_seq: Optional[int] = None
+    ):
+        """Record a completed exchange in the session's history"""
+        self.message_histories.add_turn(session_id, user_message, ai_response, last_seq)
+
+    async def schedule_compaction(self, session_id: str, session_data: Dict):
+        """Summarize older turns in the background once the history grows too long"""
+        if not self.compactor:
+            return
+        message_history = await self.get_memory(session_id)
+        self.compactor.schedule(session_id, message_history.messages, session_data.payload)
 
     def get_profile_text(self, profile: Dict[str, Any]) -> str:
         """Format profile text for embedding"""
@@ -24,6 +69,10 @@ class YaraAgent:
         Style Preferences: {', '.join(profile.get('style_preferences', []) or ['Not specified'])}
         Budget Range: {profile.get('budget_range', 'Not specified')}"""
 
+    def get_profile_hash(self, profile: Dict[str, Any]) -> str:
+        """Content hash of the embedded profile text, used to detect profile changes"""
+        return hashlib.sha256(self.get_profile_text(profile).encode("utf-8")).hexdigest()
+
     def _get_system_prompt(self, context: Dict[str, Any]) -> str:
         """Create system prompt with context"""
         return f"""You are Yara, an AI beauty consultant who provides personalized beauty advice.
@@ -58,19 +107,20 @@ class YaraAgent:
     ) -> List[Dict]:
         """Prepare messages for chat completion"""
         context = session_data.payload['profile']
-        message_history = self.get_memory(session_id)
-        
-        # Load history if not already loaded
-        if not message_history.messages:
-            for msg in session_data.payload['messages']:
-                if msg['role'] == 'user':
-                    message_history.add_user_message(msg['content'])
-                else:
-                    message_history.add_ai_message(msg['content'])
+        # Another worker may have served the previous turn
+        message_history = await self.get_memory(session_id, session_data.payload.get('last_seq'))
+
+        # Turns already folded into the running summary are replaced by it
+        summary = session_data.payload.get('summary')
+        summarized_count = session_data.payload.get('summarized_count', 0) if summary else 0
+        summary_messages = [
+            SystemMessage(content=f"Summary of the earlier conversation with this user:\n{summary}")
+        ] if summary else []
 
         # Prepare messages
         return [
             SystemMessage(content=self._get_system_prompt(context)),
-            *message_history.messages,
+            *summary_messages,
+            *message_history.messages[summarized_count:],
             HumanMessage(content=message)
         ]
\ No newline at end of file
@@ -1,21 +1,65 @@
 # processors/sql_processor.py
-from langchain_openai import ChatOpenAI
+from typing import Any, Dict, List, Optional
+import re
+import time
 from langchain.chains import create_sql_query_chain
 from langchain_community.utilities import SQLDatabase
-from sqlalchemy import create_engine, text
-from core.config import POSTGRES_URL, OPENAI_API_KEY, OPENAI_MODEL
+from sqlalchemy import text
+from services.cache import AsyncTTLCache
+from services.llm_clients import llm_clients
+from services.postgres import engine, async_engine
+from core.config import (
+    OPENAI_API_KEY,
+    OPENAI_MODEL,
+    SQL_STATEMENT_TIMEOUT_MS,
+    SQL_QUERY_CACHE_TTL,
+    SQL_QUERY_CACHE_MAX_ENTRIES,
+    SQL_RESULT_CACHE_TTL,
+    SQL_RESULT_CACHE_MAX_ENTRIES,
+    SQL_CATALOG_VERSION_TTL
+)
+
+# Generated SQL must be a single read-only statement
+READ_ONLY_SQL = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+FORBIDDEN_SQL = re.compile(
+    r"\b(insert|update|delete|merge|drop|alter|create|truncate|grant|revoke|copy|vacuum|"
+    r"call|do|execute|prepare|listen|notify|set|reset|lock|pg_sleep|pg_read_file|dblink)\b",
+    re.IGNORECASE
+)
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
 
 class SQLQueryProcessor:
+    """Answer catalogue questions by generating and running SQL.
+
+    Generated SQL is validated and cached per normalized question, so a
+    repeated question skips the LLM. Statements run on the shared asyncpg
+    pool inside a read-only transaction with a statement timeout, and
+    results are cached per SQL text until the products table changes.
+    """
+
     def __init__(self):
-        self.db = SQLDatabase.from_uri(POSTGRES_URL)
-        self.llm = ChatOpenAI(temperature=0.7, model_name=OPENAI_MODEL, api_key=OPENAI_API_KEY)
+        self.db = SQLDatabase(engine, include_tables=["products"])
+        self.llm = llm_clients.openai(OPENAI_API_KEY, OPENAI_MODEL, 0.7)
         self.chain = create_sql_query_chain(llm=self.llm, db=self.db)
+        self.sql_cache = AsyncTTLCache(
+            maxsize=SQL_QUERY_CACHE_MAX_ENTRIES,
+            ttl=SQL_QUERY_CACHE_TTL,
+            name="nl_to_sql"
+        )
+        self.result_cache = AsyncTTLCache(
+            maxsize=SQL_RESULT_CACHE_MAX_ENTRIES,
+            ttl=SQL_RESULT_CACHE_TTL,
+            name="sql_results"
+        )
+        self._catalog_version: Optional[int] = None
+        self._catalog_checked_at = 0.0
         
         # Define the table schema for context
         self.table_context = """
         The 'products' table contains beauty products with the following columns ONLY:
         - id: Integer (primary key)
         - product_name: String (name of the product, includes brand name)
+        - brand: String (brand name, e.g. 'Mamaearth', 'The Derma Co')
         - price: String (price with currency symbol)
         - price_value: Float (numerical price value)
         - rating: Float (product rating)
@@ -23,15 +67,16 @@ class SQLQueryProcessor:
         - link: String (product URL)
         
         Important notes:
-        - To search for brands or specific products, use ILIKE with the product_name or description columns
-        - Do not reference non-existent columns like 'brand' or 'category'
+        - To filter by brand, use lower(brand) = lower('<brand>')
+        - To search for specific products, use ILIKE with the product_name or description columns
+        - Do not reference non-existent columns like 'category'
         - Always use ILIKE with %% for partial matches
         - Return only the raw SQL query without any formatting or explanation
         
         Example:
         To search for Mamaearth products:
         SELECT product_name, price, description FROM products 
-        WHERE product_name ILIKE '%Mamaearth%' OR description ILIKE '%Mamaearth%'
+        WHERE lower(brand) = lower('Mamaearth')
         ORDER BY rating DESC LIMIT 5;
         """
     
@@ -56,29 +101,71 @@ class SQLQueryProcessor:
         
         return sql_query.strip()
     
-    async def process_query(self, query_text: str) -> dict:
-        """Process natural language query and return SQL results."""
-        try:
-            # Generate SQL query using the chain
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        """Normalize a question so trivially different spellings share a cache entry"""
+        return " ".join(question.lower().strip(" ?!.").split())
+
+    def validate_sql(self, sql_query: str) -> str:
+        """Reject anything but a single read-only statement"""
+        statement = sql_query.strip().rstrip(";").strip()
+        if not statement:
+            raise ValueError("Generated SQL is empty")
+        # Keywords inside string literals ('%gift set%') are just search terms
+        code = STRING_LITERAL.sub("''", statement)
+        if ";" in code:
+            raise ValueError("Generated SQL contains more than one statement")
+        if not READ_ONLY_SQL.match(code) or FORBIDDEN_SQL.search(code):
+            raise ValueError(f"Generated SQL is not a read-only query: {statement}")
+        return statement
+
+    async def generate_sql(self, query_text: str) -> str:
+        """Cleaned, validated SQL for the question, from cache when possible"""
+        async def generate():
             sql_query = await self.chain.ainvoke({
                 "question": query_text,
                 "schema": self.table_context
             })
-            
-            # Clean the SQL query
-            sql_query = self.clean_sql_query(sql_query)
-            
+            return self.validate_sql(self.clean_sql_query(sql_query))
+
+        return await self.sql_cache.get_or_load(self.normalize_question(query_text), generate)
+
+    async def _read_catalog_version(self) -> Optional[int]:
+        # Bumped by a trigger in the same transaction as every write to
+        # products (migration 0006)
+        async with async_engine.connect() as connection:
+            return (await connection.execute(text(
+                "SELECT version FROM catalog_version WHERE table_name = 'products'"
+            ))).scalar()
+
+    async def catalog_version(self) -> Optional[int]:
+        """Current products table version, re-read at most every SQL_CATALOG_VERSION_TTL seconds"""
+        now = time.monotonic()
+        if now - self._catalog_checked_at > SQL_CATALOG_VERSION_TTL:
+            self._catalog_version = await self._read_catalog_version()
+            self._catalog_checked_at = now
+        return self._catalog_version
+
+    async def _execute(self, sql_query: str) -> List[Dict[str, Any]]:
+        async with async_engine.connect() as connection:
+            async with connection.begin():
+                await connection.execute(text("SET TRANSACTION READ ONLY"))
+                await connection.execute(text(f"SET LOCAL statement_timeout = {int(SQL_STATEMENT_TIMEOUT_MS)}"))
+                result = await connection.execute(text(sql_query))
+                return [dict(row._mapping) for row in result.fetchall()]
+
+    async def run_sql(self, sql_query: str) -> List[Dict[str, Any]]:
+        """Execute on the shared async pool, caching results per catalog version"""
+        key = (await self.catalog_version(), sql_query)
+        return await self.result_cache.get_or_load(key, lambda: self._execute(sql_query))
+
+    async def process_query(self, query_text: str) -> dict:
+        """Process natural language query and return SQL results."""
+        try:
+            sql_query = await self.generate_sql(query_text)
             print(f"Cleaned SQL: {sql_query}")  # Debug logging
-            
-            # Execute query and get results
-            engine = create_engine(POSTGRES_URL)
-            with engine.connect() as connection:
-                result = connection.execute(text(sql_query))
-                rows = result.fetchall()
-                
-            # Convert results to list of dicts
-            columns = result.keys()
-            results = [dict(zip(columns, row)) for row in rows]
+
+            results = await self.run_sql(sql_query)
             
             return {
                 "query": sql_query,
@@ -91,4 +178,4 @@ class SQLQueryProcessor:
                 "error": str(e),
                 "query": None,
                 "results": None
-            }
\ No newline at end of file
+            }
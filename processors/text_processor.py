@@ -1,28 +1,42 @@
 # processors/text_processor.py
-from typing import AsyncIterator, List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 import uuid
 from datetime import datetime
 from services.openai import OpenAiService
-from services.qdrant import get_qdrant_client
+from services.qdrant import get_async_qdrant_client
+from services.session_store import get_session_store
+from services.answer_cache import SemanticAnswerCache
+from services.streaming import create_stream_encoder
 from schemas.chat import UserProfile, ChatMessage
 from processors.agent.yara import YaraAgent
-from core.config import OPENAI_API_KEY, OPENAI_MODEL
+from core.config import (
+    OPENAI_API_KEY,
+    OPENAI_MODEL,
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_SIMILARITY,
+    ANSWER_CACHE_TTL
+)
 
 class TextProcessor:
     def __init__(self):
         self.openai = OpenAiService(OPENAI_API_KEY, OPENAI_MODEL)
-        self.qdrant_client = get_qdrant_client()
         self.collection_name = "beauty_consultations"
-        self.yara_agent = YaraAgent()
+        self.session_store = get_session_store()
+        self.answer_cache = SemanticAnswerCache(
+            get_async_qdrant_client(),
+            similarity_threshold=ANSWER_CACHE_SIMILARITY,
+            ttl=ANSWER_CACHE_TTL
+        )
+        self.yara_agent = YaraAgent(
+            history_loader=self.session_store.get_messages,
+            complete=self.openai.complete,
+            persist_summary=self.session_store.set_summary
+        )
 
     async def get_session(self, session_id: str) -> Optional[Dict]:
         """Retrieve session data from Qdrant"""
         try:
-            point = self.qdrant_client.retrieve(
-                collection_name=self.collection_name,
-                ids=[session_id]
-            )
-            return point[0] if point else None
+            return await self.session_store.get_session(session_id)
         except Exception as e:
             print(f"Error retrieving session: {str(e)}")
             return None
@@ -34,50 +48,117 @@ class TextProcessor:
             profile_text = self.yara_agent.get_profile_text(user_profile.dict())
             profile_embedding = await self.openai.get_embeddings(profile_text)
             
-            self.qdrant_client.upsert(
-                collection_name=self.collection_name,
-                points=[{
-                    'id': session_id,
-                    'vector': profile_embedding,
-                    'payload': {
-                        'profile': user_profile.dict(),
-                        'messages': []
-                    }
-                }]
+            await self.session_store.create_session(
+                session_id,
+                profile=user_profile.dict(),
+                profile_hash=self.yara_agent.get_profile_hash(user_profile.dict()),
+                vector=profile_embedding
             )
             
             # Initialize memory for this session
-            self.yara_agent.get_memory(session_id)
+            self.yara_agent.create_memory(session_id)
             return session_id
         except Exception as e:
             print(f"Error initializing session: {str(e)}")
             raise
 
+    def is_cacheable(self, message: str) -> bool:
+        """Only standalone lookup questions get shared answers.
+
+        Follow-ups depend on the rest of the conversation, and small talk is
+        cheap to answer anyway. Answers are also only shared for the first
+        turn of a session, see `_is_first_turn`.
+        """
+        return ANSWER_CACHE_ENABLED and self.openai.retrieval_gate.is_lookup(message)
+
     async def chat_stream(
         self,
         session_id: str,
-        message: str
+        message: str,
+        bypass_cache: bool = False
     ) -> AsyncIterator[str]:
         """Stream chat responses"""
+        encoder = create_stream_encoder()
         try:
             session_data = await self.get_session(session_id)
             if not session_data:
-                yield '{"type": "error", "content": "Session not found"}'
+                yield encoder.error("Session not found")
                 return
 
+            profile = session_data.payload['profile']
+            question_vector = None
+            if self.is_cacheable(message) and await self._is_first_turn(session_id, session_data):
+                question_vector = await self.openai.get_embeddings(message)
+                cached = None
+                if not bypass_cache:
+                    cached = await self._lookup_cached_answer(profile, question_vector)
+                if cached:
+                    print(f"Answer cache hit for session {session_id} (score {cached['score']:.3f})")
+                    for chunk in encoder.replay(
+                        cached['answer'],
+                        start="Found a matching answer...",
+                        done="Response completed from cache"
+                    ):
+                        yield chunk
+                    await self._update_session(session_id, message, encoder.text, session_data)
+                    return
+
             messages = await self.yara_agent.prepare_messages(session_id, message, session_data)
             
-            async for chunk in self.openai.chat_stream(messages):
+            async for chunk in self.openai.chat_stream(messages, encoder=encoder):
                 yield chunk
 
-            # Get the AI's complete response from the last message
-            ai_response = messages[-1].content if messages else ""
+            # The encoder accumulated the AI's complete response; a failed or
+            # cut-off one is neither remembered nor cached
+            ai_response = encoder.text
+            if encoder.failed:
+                return
             
             # Update session with new messages
             await self._update_session(session_id, message, ai_response, session_data)
+
+            if question_vector is not None and ai_response:
+                await self._store_cached_answer(profile, message, question_vector, ai_response)
             
         except Exception as e:
-            yield f'{{"type": "error", "content": "Error in chat stream: {str(e)}"}}'
+            yield encoder.error(f"Error in chat stream: {str(e)}")
+
+    async def _is_first_turn(self, session_id: str, session_data: Dict) -> bool:
+        """Whether the session has no earlier turns that could shape the answer.
+
+        Cache entries are keyed by profile and question only, so an answer
+        that depended on something said earlier ("I'm pregnant") must never
+        be stored, and a generic cached answer must not replace one that
+        would take earlier turns into account.
+        """
+        if session_data.payload.get('summary'):
+            return False
+        history = await self.yara_agent.get_memory(session_id, session_data.payload.get('last_seq'))
+        return not history.messages
+
+    async def _lookup_cached_answer(
+        self,
+        profile: Dict[str, Any],
+        question_vector: List[float]
+    ) -> Optional[Dict[str, Any]]:
+        # A cache failure must never block a fresh answer
+        try:
+            return await self.answer_cache.lookup(profile, question_vector)
+        except Exception as e:
+            print(f"Error looking up cached answer: {str(e)}")
+            return None
+
+    async def _store_cached_answer(
+        self,
+        profile: Dict[str, Any],
+        question: str,
+        question_vector: List[float],
+        answer: str
+    ):
+        try:
+            await self.answer_cache.store(profile, question, question_vector, answer)
+        except Exception as e:
+            print(f"Error caching answer: {str(e)}")
 
     async def _update_session(
         self, 
@@ -88,11 +169,6 @@ class TextProcessor:
     ):
         """Update session with new messages"""
         try:
-            # Update agent's memory
-            memory = self.yara_agent.get_memory(session_id)
-            memory.add_user_message(user_message)
-            memory.add_ai_message(ai_response)
-
             # Create new messages
             new_messages = [
                 ChatMessage(
@@ -107,36 +183,44 @@ class TextProcessor:
                 ).dict()
             ]
 
-            # Update payload
-            updated_payload = {
-                'profile': session_data.payload['profile'],
-                'messages': session_data.payload['messages'] + new_messages
-            }
+            # O(1) append, independent of the conversation length
+            last_seq = await self.session_store.append_messages(session_id, new_messages)
 
-            # Get new embedding
-            profile_text = self.yara_agent.get_profile_text(session_data.payload['profile'])
-            vector = await self.openai.get_embeddings(profile_text)
-            
-            # Update Qdrant
-            self.qdrant_client.upsert(
-                collection_name=self.collection_name,
-                points=[{
-                    'id': session_id,
-                    'vector': vector,
-                    'payload': updated_payload
-                }]
-            )
+            # Update agent's memory
+            self.yara_agent.add_turn(session_id, user_message, ai_response, last_seq)
+            await self.yara_agent.schedule_compaction(session_id, session_data)
+
+            # Only rewrite the profile vector when the profile actually changed
+            profile = session_data.payload['profile']
+            profile_hash = self.yara_agent.get_profile_hash(profile)
+            if session_data.payload.get('profile_hash') != profile_hash:
+                profile_text = self.yara_agent.get_profile_text(profile)
+                vector = await self.openai.get_embeddings(profile_text)
+                await self.session_store.update_profile(session_id, profile, profile_hash, vector)
         except Exception as e:
             print(f"Error updating session: {str(e)}")
             raise
 
-    async def get_chat_history(self, session_id: str) -> List[ChatMessage]:
-        """Retrieve chat history for a session"""
+    async def get_chat_history(
+        self,
+        session_id: str,
+        limit: int = 50,
+        before: Optional[int] = None
+    ) -> Tuple[List[ChatMessage], Optional[int]]:
+        """Retrieve one page of chat history, walking back from the newest message.
+
+        Messages in the page are returned oldest first so they render
+        directly; pass the returned cursor as `before` to load older ones.
+        """
         try:
-            session_data = await self.get_session(session_id)
-            if not session_data:
-                return []
-            return [ChatMessage(**msg) for msg in session_data.payload['messages']]
+            if not await self.session_store.session_exists(session_id):
+                return [], None
+            page, next_cursor = await self.session_store.get_messages_page(session_id, limit, before)
+            history = [
+                ChatMessage(role=msg['role'], content=msg['content'], timestamp=msg.get('timestamp'))
+                for msg in reversed(page)
+            ]
+            return history, next_cursor
         except Exception as e:
             print(f"Error retrieving chat history: {str(e)}")
-            raise
\ No newline at end of file
+            raise
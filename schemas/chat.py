@@ -25,3 +25,4 @@ class ChatSession(BaseModel):
     
 class ChatMessageRequest(BaseModel):
     message: str = Field(..., description="Message content from the user")
+    bypass_cache: bool = Field(False, description="Always generate a fresh answer instead of replaying a cached one")
@@ -1,6 +1,6 @@
 # schemas/product.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 class ProductBase(BaseModel):
     product_name: str
@@ -15,6 +15,7 @@ class ProductCreate(ProductBase):
 class Product(ProductBase):
     id: int
     price_value: float
+    brand: Optional[str] = None
         
 class ProductInfo(BaseModel):
     """Data structure for product information"""
@@ -28,3 +29,20 @@ class ProductInfo(BaseModel):
     description: Optional[str] = Field(description="Product description or key features")
     brand: Optional[str] = Field(description="Brand name of the product")
     platform: str = Field(description="E-commerce platform (e.g., Amazon, Nykaa)")
+
+class ProductSearchResult(BaseModel):
+    id: int
+    product_name: str
+    brand: Optional[str] = None
+    price: str
+    price_value: Optional[float] = None
+    rating: Optional[float] = None
+    description: Optional[str] = None
+    link: Optional[str] = None
+    score: float = Field(description="Fused relevance score, higher is better")
+
+class ProductSearchResponse(BaseModel):
+    query: str
+    mode: str
+    results: List[ProductSearchResult] = []
+    took_ms: float
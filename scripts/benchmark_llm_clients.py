@@ -0,0 +1,72 @@
+# scripts/benchmark_llm_clients.py
+"""Compare building a new LLM client per call with reusing registry clients.
+
+By default only client construction is measured, which needs no network
+access:
+
+    python -m scripts.benchmark_llm_clients --iterations 200
+
+With --live each variant also sends a few small completions to OpenAI, so
+the cost of new connections (TLS handshakes) shows up as well:
+
+    python -m scripts.benchmark_llm_clients --live --iterations 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from langchain_openai import ChatOpenAI
+from langchain.schema import HumanMessage
+from services.llm_clients import llm_clients
+from core.config import OPENAI_API_KEY, OPENAI_MODEL
+
+PROMPT = [HumanMessage(content="Reply with the single word: ok")]
+
+def report(label: str, timings_ms):
+    print(
+        f"{label:<22} mean {statistics.mean(timings_ms):8.2f} ms  "
+        f"p50 {statistics.median(timings_ms):8.2f} ms  "
+        f"max {max(timings_ms):8.2f} ms"
+    )
+
+async def per_call(api_key: str, live: bool) -> float:
+    started = time.perf_counter()
+    llm = ChatOpenAI(model=OPENAI_MODEL, temperature=0.7, max_tokens=1000, openai_api_key=api_key)
+    if live:
+        await llm.ainvoke(PROMPT)
+    return (time.perf_counter() - started) * 1000
+
+async def pooled(api_key: str, live: bool) -> float:
+    started = time.perf_counter()
+    llm = llm_clients.openai(api_key, OPENAI_MODEL, 0.7, max_tokens=1000)
+    if live:
+        await llm.ainvoke(PROMPT)
+    return (time.perf_counter() - started) * 1000
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--live", action="store_true", help="also send a completion per call")
+    args = parser.parse_args()
+
+    if args.live and not OPENAI_API_KEY:
+        parser.error("--live needs OPENAI_API_KEY")
+    api_key = OPENAI_API_KEY or "sk-benchmark"
+
+    try:
+        # Warm up imports and the registry so the first sample is not an outlier
+        await per_call(api_key, live=False)
+        await pooled(api_key, live=False)
+
+        per_call_ms = [await per_call(api_key, args.live) for _ in range(args.iterations)]
+        pooled_ms = [await pooled(api_key, args.live) for _ in range(args.iterations)]
+    finally:
+        await llm_clients.close()
+
+    report("new client per call", per_call_ms)
+    report("registry client", pooled_ms)
+    saved = statistics.mean(per_call_ms) - statistics.mean(pooled_ms)
+    print(f"saved per call: {saved:.2f} ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+# scripts/benchmark_startup.py
+"""Report what app startup costs: cold import time per module and init time per service.
+
+Each module is imported in a fresh interpreter so earlier imports don't
+hide its cost; the time includes everything it pulls in transitively.
+Services are then built through the same container the app uses:
+
+    python -m scripts.benchmark_startup
+    python -m scripts.benchmark_startup --repeat 5 --skip-services
+    python -m scripts.benchmark_startup --modules main processors.text_processor
+"""
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = [
+    "core.config",
+    "services.postgres",
+    "services.qdrant",
+    "services.llm_clients",
+    "services.openai",
+    "services.search_api",
+    "services.product_search",
+    "processors.text_processor",
+    "processors.sql_processor",
+    "api.router",
+    "main"
+]
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print((time.perf_counter() - started) * 1000)"
+)
+
+def import_time_ms(module: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        raise RuntimeError(error[-1] if error else f"exit code {result.returncode}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+def benchmark_imports(modules, repeat: int):
+    print(f"Cold import time ({repeat} run(s) each, fresh interpreter)")
+    for module in modules:
+        try:
+            timings = [import_time_ms(module) for _ in range(repeat)]
+        except RuntimeError as e:
+            print(f"  {module:<28} failed: {str(e)}")
+            continue
+        print(f"  {module:<28} median {statistics.median(timings):8.1f} ms  max {max(timings):8.1f} ms")
+
+async def benchmark_services():
+    from services.container import build_services
+    from services.qdrant import close_qdrant_clients
+    from services.llm_clients import llm_clients
+
+    services = build_services()
+    print("Service init time (factory in a thread, then its start hook)")
+    try:
+        for name in services.stats():
+            started = time.perf_counter()
+            try:
+                await services.get(name)
+            except Exception as e:
+                print(f"  {name:<28} failed: {str(e)}")
+                continue
+            timings = services.timings_ms[name]
+            total = (time.perf_counter() - started) * 1000
+            print(
+                f"  {name:<28} init {timings['init_ms']:8.1f} ms  "
+                f"start {timings['start_ms']:8.1f} ms  total {total:8.1f} ms"
+            )
+    finally:
+        await llm_clients.close()
+        await close_qdrant_clients()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=MODULES, help="modules to time the import of")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh imports per module")
+    parser.add_argument("--skip-services", action="store_true", help="only measure imports")
+    args = parser.parse_args()
+
+    benchmark_imports(args.modules, args.repeat)
+    if not args.skip_services:
+        asyncio.run(benchmark_services())
+
+if __name__ == "__main__":
+    main()
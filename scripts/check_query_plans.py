@@ -0,0 +1,86 @@
+# scripts/check_query_plans.py
+"""Regression check that product queries are served by their indexes.
+
+Runs EXPLAIN (FORMAT JSON) for the query shapes the SQL processor and the
+product search generate, and fails when a plan does not use the index it
+is meant to. Sequential scans are disabled for the check, because on a
+small catalog the planner rightly prefers them; what matters here is that
+an index exists that can serve the predicate or sort at all.
+
+    python -m scripts.check_query_plans
+"""
+import json
+import sys
+from sqlalchemy import text
+from services.postgres import engine
+
+# (description, query, index that must appear in the plan)
+CHECKS = [
+    (
+        "ILIKE on product_name",
+        "SELECT id FROM products WHERE product_name ILIKE '%face wash%'",
+        "ix_products_product_name_trgm"
+    ),
+    (
+        "ILIKE on description",
+        "SELECT id FROM products WHERE description ILIKE '%salicylic%'",
+        "ix_products_description_trgm"
+    ),
+    (
+        "ORDER BY rating",
+        "SELECT id FROM products ORDER BY rating DESC LIMIT 5",
+        "ix_products_rating"
+    ),
+    (
+        "price range",
+        "SELECT id FROM products WHERE price_value BETWEEN 100 AND 500",
+        "ix_products_price_value"
+    ),
+    (
+        "ORDER BY price_value",
+        "SELECT id FROM products ORDER BY price_value LIMIT 5",
+        "ix_products_price_value"
+    ),
+    (
+        "brand filter",
+        "SELECT id FROM products WHERE lower(brand) = lower('Mamaearth')",
+        "ix_products_brand"
+    ),
+    (
+        "full-text search",
+        "SELECT id FROM products WHERE search_vector @@ websearch_to_tsquery('english', 'sunscreen')",
+        "ix_products_search_vector"
+    )
+]
+
+def plan_indexes(node) -> set:
+    """Every index name used anywhere in an EXPLAIN JSON plan"""
+    found = set()
+    if isinstance(node, dict):
+        if "Index Name" in node:
+            found.add(node["Index Name"])
+        for value in node.values():
+            found |= plan_indexes(value)
+    elif isinstance(node, list):
+        for item in node:
+            found |= plan_indexes(item)
+    return found
+
+def main() -> int:
+    failures = 0
+    with engine.connect() as connection:
+        with connection.begin():
+            connection.execute(text("SET LOCAL enable_seqscan = off"))
+            for description, query, index_name in CHECKS:
+                plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {query}")).scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                used = plan_indexes(plan)
+                ok = index_name in used
+                failures += not ok
+                print(f"{'ok  ' if ok else 'FAIL'} {description}: expected {index_name}, plan uses {sorted(used) or 'no index'}")
+    print(f"{len(CHECKS) - failures}/{len(CHECKS)} query plans use their index")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
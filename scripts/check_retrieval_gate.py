@@ -0,0 +1,50 @@
+# scripts/check_retrieval_gate.py
+"""Regression check of the retrieval gate's decisions on representative messages.
+
+Runs the gate at the configured threshold and fails when a message is
+routed differently than expected, e.g. a core skincare question that
+would no longer get web sources. Needs no network or database:
+
+    python -m scripts.check_retrieval_gate
+"""
+import sys
+from services.retrieval_gate import RetrievalGate
+from core.config import RETRIEVAL_GATE_THRESHOLD
+
+# (message, earlier user messages, expected needs_retrieval)
+CHECKS = [
+    ("How do I treat acne?", [], True),
+    ("Any tips for dark circles?", [], True),
+    ("What helps with pigmentation on my cheeks?", [], True),
+    ("My hair is really frizzy after washing", [], True),
+    ("Best sunscreen for oily skin under 500?", [], True),
+    ("Is retinol safe during pregnancy?", [], True),
+    ("What products suit my skin type?", [], True),
+    ("Can you suggest a dupe for the Charlotte Tilbury foundation?", [], True),
+    ("and for dry skin?", ["Best moisturizer for winter?"], True),
+    ("You recommended retinol earlier, is it safe with vitamin C?", [], True),
+    ("hi", [], False),
+    ("Thanks!", [], False),
+    ("ok", [], False),
+    ("sounds good", [], False),
+    ("What did you recommend earlier?", [], False),
+    ("Can you summarize our conversation?", [], False),
+    ("What is my skin type?", [], False)
+]
+
+def main() -> int:
+    gate = RetrievalGate(threshold=RETRIEVAL_GATE_THRESHOLD)
+    failures = 0
+    for message, history, expected in CHECKS:
+        decision = gate.decide(message, history)
+        ok = decision["needs_retrieval"] == expected
+        failures += not ok
+        print(
+            f"{'ok  ' if ok else 'FAIL'} {message!r}: expected "
+            f"{'retrieve' if expected else 'skip'}, score {decision['score']}"
+        )
+    print(f"{len(CHECKS) - failures}/{len(CHECKS)} gate decisions as expected (threshold {gate.threshold})")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
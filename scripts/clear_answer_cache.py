@@ -0,0 +1,33 @@
+# scripts/clear_answer_cache.py
+"""Invalidate the semantic answer cache.
+
+Run after changing prompts, the product catalog or anything else that makes
+stored answers outdated:
+
+    python -m scripts.clear_answer_cache            # drop every cached answer
+    python -m scripts.clear_answer_cache --expired  # only drop expired ones
+"""
+import argparse
+import asyncio
+from services.qdrant import get_async_qdrant_client, close_qdrant_clients
+from services.answer_cache import SemanticAnswerCache
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expired", action="store_true", help="only delete entries past their TTL")
+    args = parser.parse_args()
+
+    cache = SemanticAnswerCache(get_async_qdrant_client())
+    try:
+        await cache.init()
+        if args.expired:
+            await cache.purge_expired()
+            print("Deleted expired cached answers")
+        else:
+            await cache.invalidate()
+            print("Deleted all cached answers")
+    finally:
+        await close_qdrant_clients()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+# scripts/load_products.py
+"""Stream a product catalog (JSON array or NDJSON) into the products table.
+
+Products are upserted on their link, so re-running with a fresh crawl
+updates prices and ratings in place. The rows the load inserted or changed
+are re-embedded for product search afterwards:
+
+    python -m scripts.load_products datasets/product.json
+    python -m scripts.load_products crawl.ndjson --batch-size 10000 --skip-index
+    python -m scripts.load_products crawl.ndjson --sync-index
+"""
+import argparse
+import asyncio
+from typing import List, Optional
+from services.postgres import engine
+from services.migrations import run_migrations
+from utils.bulk_loader import bulk_load_products
+from core.config import BULK_LOAD_BATCH_SIZE
+
+async def update_search_index(changed: Optional[List[int]]):
+    """Index the changed products, or run a full sync when `changed` is None"""
+    from services.product_search import create_product_search
+    from services.qdrant import close_qdrant_clients
+    product_search = create_product_search()
+    try:
+        await product_search.init()
+        if changed is None:
+            await product_search.sync()
+        else:
+            await product_search.index_ids(changed)
+            print(f"Re-indexed {len(changed)} changed products")
+    finally:
+        await close_qdrant_clients()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JSON or NDJSON file with product_name, price, rating, description, link")
+    parser.add_argument("--batch-size", type=int, default=BULK_LOAD_BATCH_SIZE)
+    index = parser.add_mutually_exclusive_group()
+    index.add_argument(
+        "--sync-index",
+        action="store_true",
+        help="reconcile the whole product search index afterwards, not just the changed rows"
+    )
+    index.add_argument(
+        "--skip-index",
+        action="store_true",
+        help="leave the product search index alone (the app syncs it on its next start)"
+    )
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    changed: List[int] = []
+    bulk_load_products(engine, args.path, batch_size=args.batch_size, on_changed=changed.extend)
+    if args.sync_index:
+        asyncio.run(update_search_index(None))
+    elif changed and not args.skip_index:
+        asyncio.run(update_search_index(changed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# scripts/migrate_db.py
+"""Apply or inspect the database schema migrations in migrations/.
+
+The app applies pending migrations on startup; run this to migrate ahead
+of a deploy or to see where a database stands:
+
+    python -m scripts.migrate_db           # apply pending migrations
+    python -m scripts.migrate_db --status  # list applied and pending ones
+"""
+import argparse
+from services.postgres import engine
+from services.migrations import run_migrations, migration_status
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="only show migration status")
+    args = parser.parse_args()
+
+    if args.status:
+        for migration in migration_status(engine):
+            state = migration["applied_at"] or "pending"
+            print(f"{migration['version']}_{migration['name']}: {state}")
+        return
+
+    applied = run_migrations(engine)
+    print(f"Applied {len(applied)} migration(s)" if applied else "Database schema is up to date")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+# scripts/migrate_sessions.py
+"""Move chat history of legacy sessions into per-message points.
+
+Sessions created before the append-only layout keep their whole history
+in a `messages` list on the session point. They are migrated lazily on
+first read; run this once after deploying to migrate all of them eagerly:
+
+    python -m scripts.migrate_sessions
+"""
+import asyncio
+from services.qdrant import get_async_qdrant_client, close_qdrant_clients
+from services.session_store import QdrantSessionStore
+
+async def main():
+    store = QdrantSessionStore(get_async_qdrant_client())
+    try:
+        await store.init()
+        migrated = await store.migrate_all()
+        print(f"Migrated {migrated} legacy session(s)")
+    finally:
+        await close_qdrant_clients()
+
+if __name__ == "__main__":
+    asyncio.run(main())
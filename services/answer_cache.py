@@ -0,0 +1,165 @@
+# services/answer_cache.py
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import time
+import uuid
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    MatchValue,
+    PayloadSchemaType,
+    PointStruct,
+    Range,
+    VectorParams
+)
+from services.qdrant import ensure_collection
+
+def canonical_profile(profile: Dict[str, Any]) -> str:
+    """Stable text form of a profile, so equivalent profiles share cache entries.
+
+    Empty fields are dropped, strings are lowercased and trimmed, and lists
+    are sorted, so field order and casing don't matter.
+    """
+    def normalize(value):
+        if isinstance(value, str):
+            return value.strip().lower()
+        if isinstance(value, list):
+            return sorted(normalize(item) for item in value if item not in (None, ""))
+        return value
+
+    canonical = {
+        key: normalize(value)
+        for key, value in profile.items()
+        if value not in (None, "", [])
+    }
+    return json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+
+def profile_key(profile: Dict[str, Any]) -> str:
+    return hashlib.sha256(canonical_profile(profile).encode("utf-8")).hexdigest()
+
+class SemanticAnswerCache:
+    """Cache of generated answers keyed by profile and question meaning.
+
+    Entries live in their own Qdrant collection next to the consultations.
+    A lookup only considers entries with the same canonical profile that
+    have not expired, and returns the closest stored answer whose question
+    embedding has a cosine similarity of at least `similarity_threshold`.
+    """
+
+    def __init__(
+        self,
+        client: AsyncQdrantClient,
+        collection_name: str = "beauty_answer_cache",
+        vector_size: int = 1536,
+        similarity_threshold: float = 0.92,
+        ttl: float = 24 * 3600
+    ):
+        self.client = client
+        self.collection_name = collection_name
+        self.vector_size = vector_size
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def init(self):
+        """Create the cache collection and its payload indexes if missing"""
+        if await ensure_collection(
+            self.client,
+            self.collection_name,
+            vectors_config=VectorParams(size=self.vector_size, distance=Distance.COSINE)
+        ):
+            print(f"Collection {self.collection_name} successfully initialized")
+        await self.client.create_payload_index(
+            collection_name=self.collection_name,
+            field_name="profile_key",
+            field_schema=PayloadSchemaType.KEYWORD
+        )
+        await self.client.create_payload_index(
+            collection_name=self.collection_name,
+            field_name="expires_at",
+            field_schema=PayloadSchemaType.FLOAT
+        )
+
+    async def lookup(self, profile: Dict[str, Any], question_vector: List[float]) -> Optional[Dict[str, Any]]:
+        """Return the best matching fresh entry (question, answer, score) or None"""
+        result = await self.client.query_points(
+            collection_name=self.collection_name,
+            query=question_vector,
+            query_filter=Filter(must=[
+                FieldCondition(key="profile_key", match=MatchValue(value=profile_key(profile))),
+                FieldCondition(key="expires_at", range=Range(gt=time.time()))
+            ]),
+            limit=1,
+            score_threshold=self.similarity_threshold,
+            with_payload=["question", "answer"],
+            with_vectors=False
+        )
+        if not result.points:
+            self.misses += 1
+            return None
+        self.hits += 1
+        point = result.points[0]
+        return {
+            "question": point.payload["question"],
+            "answer": point.payload["answer"],
+            "score": point.score
+        }
+
+    async def store(
+        self,
+        profile: Dict[str, Any],
+        question: str,
+        question_vector: List[float],
+        answer: str
+    ):
+        key = profile_key(profile)
+        now = time.time()
+        await self.client.upsert(
+            collection_name=self.collection_name,
+            points=[PointStruct(
+                # Asking the same question again refreshes the entry instead of adding one
+                id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"{key}/{question.strip().lower()}")),
+                vector=question_vector,
+                payload={
+                    "profile_key": key,
+                    "question": question,
+                    "answer": answer,
+                    "created_at": now,
+                    "expires_at": now + self.ttl
+                }
+            )]
+        )
+
+    async def invalidate(self, profile: Optional[Dict[str, Any]] = None):
+        """Drop cached answers for one profile, or all of them"""
+        conditions = []
+        if profile is not None:
+            conditions.append(
+                FieldCondition(key="profile_key", match=MatchValue(value=profile_key(profile)))
+            )
+        await self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=FilterSelector(filter=Filter(must=conditions))
+        )
+
+    async def purge_expired(self):
+        """Delete entries past their TTL; lookups already ignore them"""
+        await self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=FilterSelector(filter=Filter(must=[
+                FieldCondition(key="expires_at", range=Range(lte=time.time()))
+            ]))
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,103 @@
+# services/cache.py
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from collections import OrderedDict
+import asyncio
+import time
+
+class AsyncTTLCache:
+    """In-process TTL + LRU cache for async loaders.
+
+    - Entries are fresh for `ttl` seconds and evicted least-recently-used
+      once `maxsize` is reached.
+    - For a further `stale_ttl` seconds an expired entry is still served
+      while a single background refresh runs (stale-while-revalidate).
+    - Concurrent misses for the same key share one loader call (single-flight).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300, stale_ttl: float = 0, name: str = "cache"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a fresh cached value or None, without loading"""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, calling loader on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[1]
+            if age <= self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+            if age <= self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    self._start_load(key, loader).add_done_callback(self._log_refresh_error)
+                return entry[0]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            future = self._start_load(key, loader)
+        return await asyncio.shield(future)
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        async def run():
+            try:
+                value = await loader()
+                self.set(key, value)
+                return value
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+        return task
+
+    def _log_refresh_error(self, task: asyncio.Future):
+        if not task.cancelled() and task.exception():
+            print(f"Error refreshing {self.name} entry: {task.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else 0.0
+        }
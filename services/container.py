@@ -0,0 +1,117 @@
+# services/container.py
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+import asyncio
+import time
+from fastapi import Request
+
+class ServiceContainer:
+    """Application services built on first use instead of at import time.
+
+    Each service is registered as a factory (plus an optional async `start`
+    hook). The first `get` builds it in a worker thread, so slow constructors
+    and the heavy imports they trigger never block the event loop; callers
+    arriving meanwhile await the same build. `warm_up` builds services in the
+    background after startup so the first request rarely pays for them.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._start_hooks: Dict[str, Optional[Callable[[Any], Awaitable[None]]]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+        self.timings_ms: Dict[str, Dict[str, float]] = {}
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        start: Optional[Callable[[Any], Awaitable[None]]] = None
+    ):
+        if name in self._factories:
+            raise ValueError(f"Service {name!r} is already registered")
+        self._factories[name] = factory
+        self._start_hooks[name] = start
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._instances
+
+    async def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        if name not in self._factories:
+            raise KeyError(f"Unknown service {name!r}")
+
+        task = self._pending.get(name)
+        if task is None:
+            # Builds run as their own task so a cancelled request can't abort
+            # a build other requests are waiting on
+            task = asyncio.create_task(self._build(name))
+            self._pending[name] = task
+            task.add_done_callback(lambda _: self._pending.pop(name, None))
+        # A failed build is not stored, so the next get() tries again
+        return await asyncio.shield(task)
+
+    async def _build(self, name: str) -> Any:
+        started = time.perf_counter()
+        instance = await asyncio.to_thread(self._factories[name])
+        built = time.perf_counter()
+        start = self._start_hooks[name]
+        if start is not None:
+            await start(instance)
+        finished = time.perf_counter()
+        self.timings_ms[name] = {
+            "init_ms": round((built - started) * 1000, 2),
+            "start_ms": round((finished - built) * 1000, 2)
+        }
+        print(f"Service {name} ready in {(finished - started) * 1000:.0f} ms")
+        self._instances[name] = instance
+        return instance
+
+    async def warm_up(self, names: Optional[Iterable[str]] = None):
+        """Build the given services (all by default), logging failures instead of raising"""
+        for name in list(names if names is not None else self._factories):
+            try:
+                await self.get(name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error warming up service {name}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {"ready": name in self._instances, **self.timings_ms.get(name, {})}
+            for name in self._factories
+        }
+
+def service(name: str):
+    """FastAPI dependency resolving a service from the app's container"""
+    async def dependency(request: Request) -> Any:
+        return await request.app.state.services.get(name)
+    return dependency
+
+def _text_processor():
+    from processors.text_processor import TextProcessor
+    return TextProcessor()
+
+def _source_extractor():
+    from services.search_api import SourceExtractorService
+    return SourceExtractorService()
+
+def _product_search():
+    from services.product_search import create_product_search
+    return create_product_search()
+
+async def _start_product_search(search_engine):
+    await search_engine.init()
+    # Embedding the catalog can take a while; it runs in the background, and
+    # sync() skips itself in workers while another one is already at it
+    search_engine.schedule_sync()
+
+def build_services() -> ServiceContainer:
+    """The container used by the app; each factory imports its own dependencies"""
+    services = ServiceContainer()
+    services.register("text_processor", _text_processor)
+    services.register("source_extractor", _source_extractor)
+    services.register("product_search", _product_search, start=_start_product_search)
+    return services
@@ -0,0 +1,119 @@
+# services/content_cache.py
+from typing import Dict, Optional
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+class ContentCache:
+    """Disk-backed cache of extracted page text keyed by URL.
+
+    Backed by a SQLite file in WAL mode so every worker process on the host
+    shares the same entries. Each entry keeps the response ETag/Last-Modified
+    so stale entries can be revalidated with a conditional GET. Once the
+    stored text exceeds `max_bytes`, least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS content_cache (
+                url TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_content_cache_accessed ON content_cache (accessed_at)"
+        )
+
+    def is_fresh(self, entry: Dict) -> bool:
+        """Whether an entry can be served without revalidating"""
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def _get(self, url: str) -> Optional[Dict]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT content, etag, last_modified, fetched_at FROM content_cache WHERE url = ?",
+            (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE content_cache SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        return dict(row)
+
+    def _put(self, url: str, content: str, etag: Optional[str], last_modified: Optional[str]):
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO content_cache
+                (url, content, etag, last_modified, size, fetched_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (url, content, etag, last_modified, len(content.encode("utf-8")), now, now)
+        )
+        self._evict()
+
+    def _touch(self, url: str):
+        now = time.time()
+        self._connection().execute(
+            "UPDATE content_cache SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+            (now, now, url)
+        )
+
+    def _evict(self):
+        conn = self._connection()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM content_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% so we don't run this on every subsequent put
+        excess = total - int(self.max_bytes * 0.9)
+        conn.execute(
+            """
+            DELETE FROM content_cache WHERE url IN (
+                SELECT url FROM (
+                    SELECT url, size, SUM(size) OVER (ORDER BY accessed_at) AS running
+                    FROM content_cache
+                ) WHERE running - size < ?
+            )
+            """,
+            (excess,)
+        )
+
+    async def get(self, url: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self._get, url)
+
+    async def put(self, url: str, content: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        await asyncio.to_thread(self._put, url, content, etag, last_modified)
+
+    async def touch(self, url: str):
+        """Mark an entry as revalidated (e.g. after a 304 response)"""
+        await asyncio.to_thread(self._touch, url)
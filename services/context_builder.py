@@ -0,0 +1,149 @@
+# services/context_builder.py
+from typing import Dict, List, Tuple
+from collections import Counter
+import math
+from utils.tokens import estimate_tokens, tokenize
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "best", "by", "can", "do", "for",
+    "from", "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "should",
+    "that", "the", "this", "to", "what", "which", "with", "you", "your"
+}
+
+class ContextBuilder:
+    """Build the source context for the system prompt within a token budget.
+
+    Sources are split into passages, ranked against the user message with
+    BM25, near-duplicate passages are dropped and the best passages are
+    packed until `token_budget` is reached.
+    """
+
+    def __init__(
+        self,
+        token_budget: int,
+        passage_chars: int,
+        dedupe_threshold: float = 0.8,
+        k1: float = 1.5,
+        b: float = 0.75
+    ):
+        self.token_budget = token_budget
+        self.passage_chars = passage_chars
+        self.dedupe_threshold = dedupe_threshold
+        self.k1 = k1
+        self.b = b
+        self.tokens_sent = 0
+        self.tokens_saved = 0
+
+    def chunk(self, source_idx: int, content: str) -> List[Dict]:
+        """Split a source into paragraph-aligned passages of ~passage_chars"""
+        passages, current = [], ""
+        for paragraph in (p.strip() for p in content.split("\n")):
+            if not paragraph:
+                continue
+            if current and len(current) + len(paragraph) + 1 > self.passage_chars:
+                passages.append(current)
+                current = ""
+            # Hard-split paragraphs that are longer than a passage on their own
+            while len(paragraph) > self.passage_chars:
+                cut = paragraph.rfind(" ", 0, self.passage_chars)
+                cut = cut if cut > 0 else self.passage_chars
+                passages.append(paragraph[:cut])
+                paragraph = paragraph[cut:].strip()
+            current = f"{current}\n{paragraph}" if current else paragraph
+        if current:
+            passages.append(current)
+
+        return [
+            {"source": source_idx, "position": position, "text": text, "terms": tokenize(text)}
+            for position, text in enumerate(passages)
+        ]
+
+    def score(self, passages: List[Dict], query: str):
+        """Score passages against the query with Okapi BM25"""
+        query_terms = [term for term in tokenize(query) if term not in STOPWORDS]
+        if not passages or not query_terms:
+            for passage in passages:
+                passage["score"] = 0.0
+            return
+
+        doc_freq = Counter()
+        for passage in passages:
+            doc_freq.update(set(passage["terms"]))
+        avg_len = sum(len(p["terms"]) for p in passages) / len(passages) or 1
+        total = len(passages)
+
+        for passage in passages:
+            term_freq = Counter(passage["terms"])
+            length_norm = self.k1 * (1 - self.b + self.b * len(passage["terms"]) / avg_len)
+            score = 0.0
+            for term in query_terms:
+                tf = term_freq.get(term)
+                if not tf:
+                    continue
+                idf = math.log(1 + (total - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+                score += idf * tf * (self.k1 + 1) / (tf + length_norm)
+            passage["score"] = score
+
+    def _shingles(self, terms: List[str], size: int = 3) -> set:
+        if len(terms) < size:
+            return {tuple(terms)}
+        return {tuple(terms[i:i + size]) for i in range(len(terms) - size + 1)}
+
+    def dedupe(self, ranked: List[Dict]) -> List[Dict]:
+        """Drop passages that are near-copies of a better ranked passage"""
+        kept, kept_shingles = [], []
+        for passage in ranked:
+            shingles = self._shingles(passage["terms"])
+            if any(
+                len(shingles & other) / (len(shingles | other) or 1) >= self.dedupe_threshold
+                for other in kept_shingles
+            ):
+                continue
+            kept.append(passage)
+            kept_shingles.append(shingles)
+        return kept
+
+    def build(self, query: str, sources: List[Dict]) -> Tuple[str, Dict]:
+        """Return the packed context string and token accounting for one turn"""
+        passages = []
+        for idx, source in enumerate(sources):
+            passages.extend(self.chunk(idx, source.get("content") or ""))
+        full_tokens = sum(estimate_tokens(p["text"]) for p in passages)
+
+        self.score(passages, query)
+        ranked = sorted(passages, key=lambda p: (-p["score"], p["source"], p["position"]))
+        ranked = self.dedupe(ranked)
+
+        selected, used = [], 0
+        for passage in ranked:
+            tokens = estimate_tokens(passage["text"])
+            if used + tokens > self.token_budget:
+                continue
+            selected.append(passage)
+            used += tokens
+
+        # Group the selected passages back under their sources, in reading order
+        context_parts = []
+        for idx, source in enumerate(sources):
+            texts = [
+                p["text"] for p in sorted(selected, key=lambda p: p["position"])
+                if p["source"] == idx
+            ]
+            if not texts:
+                continue
+            context_parts.append(
+                f"Source {len(context_parts) + 1}:\n"
+                f"Title: {source['title']}\n"
+                f"URL: {source['url']}\n"
+                "Content:\n" + "\n...\n".join(texts) + "\n"
+            )
+
+        stats = {
+            "passages_total": len(passages),
+            "passages_sent": len(selected),
+            "tokens_sent": used,
+            "tokens_saved": max(full_tokens - used, 0)
+        }
+        self.tokens_sent += stats["tokens_sent"]
+        self.tokens_saved += stats["tokens_saved"]
+        return "\n".join(context_parts), stats
@@ -4,6 +4,7 @@ from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from core.config import OPENAI_API_KEY, OPENAI_MODEL
 from schemas.product import ProductInfo
+from services.http_client import get_http_session
 import logging
 from typing import Optional
 from bs4 import BeautifulSoup
@@ -80,20 +81,25 @@ class RealTimeCrawler:
 
 		for attempt in range(retries):
 			try:
-				async with aiohttp.ClientSession(headers=config['headers']) as session:
-					async with session.get(url, ssl=False, timeout=30) as response:
-						if response.status == 200:
-							return await response.text()
-						elif response.status == 404:
-							logger.error(f"Page not found: {url}")
-							return None
-						elif response.status == 429:
-							wait_time = 2 ** attempt
-							logger.warning(f"Rate limited. Waiting {wait_time} seconds...")
-							await asyncio.sleep(wait_time)
-							continue
-						else:
-							logger.error(f"Failed to fetch page: {response.status}")
+				session = get_http_session()
+				async with session.get(
+					url,
+					headers=config['headers'],
+					ssl=False,
+					timeout=aiohttp.ClientTimeout(total=30)
+				) as response:
+					if response.status == 200:
+						return await response.text()
+					elif response.status == 404:
+						logger.error(f"Page not found: {url}")
+						return None
+					elif response.status == 429:
+						wait_time = 2 ** attempt
+						logger.warning(f"Rate limited. Waiting {wait_time} seconds...")
+						await asyncio.sleep(wait_time)
+						continue
+					else:
+						logger.error(f"Failed to fetch page: {response.status}")
 			except Exception as e:
 				logger.error(f"Error fetching page (attempt {attempt + 1}): {str(e)}")
 				if attempt < retries - 1:
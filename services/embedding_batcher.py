@@ -0,0 +1,102 @@
+# services/embedding_batcher.py
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import time
+
+def embed_queries(embeddings) -> Callable[[List[str]], List[List[float]]]:
+    """Batch function returning exactly what `embeddings.embed_query` returns.
+
+    For backends whose query and document paths differ (e.g. Ollama's
+    "query: " / "passage: " instructions), so batched lookups keep their
+    query vectors.
+    """
+    def embed(texts: List[str]) -> List[List[float]]:
+        return [embeddings.embed_query(text) for text in texts]
+    return embed
+
+class EmbeddingBatcher:
+    """Collect concurrent embedding requests into batched calls.
+
+    Callers queue a text and await a future. The queue is flushed when
+    `max_batch_size` texts are waiting or `max_wait_ms` after the first one
+    arrived, whichever comes first; each flush is one `embed_batch` call
+    on a worker thread whose results are fanned back to the callers.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 10,
+        name: str = "embeddings"
+    ):
+        self.embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms_seen = 0.0
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a single text as part of the next batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, time.perf_counter()))
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future, float]]):
+        started = time.perf_counter()
+        for _, _, queued_at in batch:
+            waited_ms = (started - queued_at) * 1000
+            self.total_wait_ms += waited_ms
+            self.max_wait_ms_seen = max(self.max_wait_ms_seen, waited_ms)
+
+        # Identical texts in the same window are embedded once
+        unique_texts = list(dict.fromkeys(text for text, _, _ in batch))
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(unique_texts))
+
+        try:
+            vectors = await asyncio.to_thread(self.embed_batch, unique_texts)
+            by_text = dict(zip(unique_texts, vectors))
+            for text, future, _ in batch:
+                if not future.done():
+                    future.set_result(by_text[text])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "avg_queue_wait_ms": round(self.total_wait_ms / self.requests, 2) if self.requests else 0.0,
+            "max_queue_wait_ms": round(self.max_wait_ms_seen, 2)
+        }
@@ -0,0 +1,108 @@
+# services/embedding_cache.py
+from typing import Awaitable, Callable, List, Optional
+from array import array
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from services.cache import AsyncTTLCache
+from core.config import (
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MEMORY_ENTRIES,
+    EMBEDDING_CACHE_MAX_ENTRIES
+)
+
+class EmbeddingCache:
+    """Two-tier embedding cache keyed by a hash of model name and text.
+
+    The first tier is an in-process LRU (which also collapses concurrent
+    requests for the same text into one computation); the second is a
+    SQLite file shared by all workers on the host, so identical profiles
+    are embedded once and survive restarts.
+    """
+
+    def __init__(self, path: str, memory_entries: int, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.memory = AsyncTTLCache(maxsize=memory_entries, ttl=float("inf"), name="embeddings")
+        self._local = threading.local()
+        self._puts = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection().execute(
+            "CREATE INDEX IF NOT EXISTS idx_embedding_cache_accessed ON embedding_cache (accessed_at)"
+        )
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _load(self, key: str) -> Optional[List[float]]:
+        conn = self._connection()
+        row = conn.execute("SELECT vector FROM embedding_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE embedding_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return array("f", row[0]).tolist()
+
+    def _store(self, key: str, vector: List[float]):
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO embedding_cache (key, vector, accessed_at) VALUES (?, ?, ?)",
+            (key, array("f", vector).tobytes(), time.time())
+        )
+        self._puts += 1
+        if self._puts % 100 == 0:
+            conn.execute(
+                """
+                DELETE FROM embedding_cache WHERE key IN (
+                    SELECT key FROM embedding_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            )
+
+    async def get_or_compute(
+        self,
+        model: str,
+        text: str,
+        compute: Callable[[str], Awaitable[List[float]]]
+    ) -> List[float]:
+        """Return the cached embedding for text, computing and storing it on a miss"""
+        key = self.key(model, text)
+
+        async def load():
+            vector = await asyncio.to_thread(self._load, key)
+            if vector is None:
+                vector = await compute(text)
+                await asyncio.to_thread(self._store, key, vector)
+            return vector
+
+        return await self.memory.get_or_load(key, load)
+
+embedding_cache = EmbeddingCache(
+    path=EMBEDDING_CACHE_PATH,
+    memory_entries=EMBEDDING_CACHE_MEMORY_ENTRIES,
+    max_entries=EMBEDDING_CACHE_MAX_ENTRIES
+)
@@ -0,0 +1,179 @@
+# services/extraction.py
+from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import multiprocessing
+import os
+from core.config import EXTRACTION_WORKERS, EXTRACTION_MAX_HTML_CHARS, EXTRACTION_TIMEOUT
+
+# How often the watchdog checks running jobs, in seconds
+WATCHDOG_INTERVAL = 0.5
+
+def _extract_html(html: str) -> Optional[str]:
+    """Run trafilatura on one page (executes inside a worker process)"""
+    import trafilatura
+    try:
+        return trafilatura.extract(
+            html,
+            include_links=False,
+            include_images=False,
+            include_tables=False
+        )
+    except Exception:
+        return None
+
+def _extract_batch(htmls: List[str]) -> List[Optional[str]]:
+    return [_extract_html(html) for html in htmls]
+
+def _warmup():
+    """Worker initializer: import trafilatura and exercise it once"""
+    _extract_html("<html><body><article><p>Warming up the extractor.</p></article></body></html>")
+
+class ExtractionEngine:
+    """Process pool running trafilatura off the event loop and outside the GIL.
+
+    Workers are spawned and warmed on startup and input HTML is truncated
+    to `max_html_chars`. A watchdog recycles the whole pool when a job has
+    been running for longer than `timeout` seconds per page, so a hung
+    worker cannot wedge future requests. A caller's own deadline only ends
+    its wait; it never touches the pool or other callers' jobs.
+    """
+
+    def __init__(self, workers: int, max_html_chars: int, timeout: float):
+        self.workers = workers
+        self.max_html_chars = max_html_chars
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._watchdogs: Set[asyncio.Task] = set()
+        self.recycles = 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warmup
+        )
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = self._new_executor()
+        return self._executor
+
+    async def start(self):
+        """Spawn every worker ahead of traffic; each one warms up in its initializer"""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self.executor, os.getpid) for _ in range(self.workers)
+        ])
+        print(f"Extraction engine ready with {self.workers} worker(s)")
+
+    async def shutdown(self):
+        for watchdog in list(self._watchdogs):
+            watchdog.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _recycle(self, executor: ProcessPoolExecutor):
+        """Kill a pool with a hung or crashed worker and start a fresh one"""
+        if self._executor is not executor:
+            return  # already recycled by another job
+        self.recycles += 1
+        self._executor = self._new_executor()
+        # ProcessPoolExecutor has no public API to kill a busy worker
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        print(f"Extraction pool recycled ({self.recycles} so far)")
+
+    async def _watch(self, executor: ProcessPoolExecutor, jobs: List[Tuple[Future, float]]):
+        """Recycle the pool if any job runs longer than its budget.
+
+        Time spent queued behind other jobs doesn't count; the clock starts
+        once the executor hands the job to a worker.
+        """
+        loop = asyncio.get_running_loop()
+        started_at: Dict[int, float] = {}
+        interval = min(WATCHDOG_INTERVAL, self.timeout / 4)
+        while True:
+            jobs = [(job, budget) for job, budget in jobs if not job.done()]
+            if not jobs:
+                return
+            now = loop.time()
+            for job, budget in jobs:
+                if job.running():
+                    started = started_at.setdefault(id(job), now)
+                    if now - started > budget:
+                        self._recycle(executor)
+                        return
+            await asyncio.sleep(interval)
+
+    def _bound(self, html: str) -> str:
+        return html[:self.max_html_chars] if html else ""
+
+    async def extract(self, html: str) -> Optional[str]:
+        """Extract the main text of a single page"""
+        results = await self.extract_many([html])
+        return results[0]
+
+    async def extract_many(self, htmls: List[str], deadline: Optional[float] = None) -> List[Optional[str]]:
+        """Extract many pages, one round trip per worker.
+
+        Pages are split into at most `workers` chunks that run in parallel.
+        Pages whose chunk hasn't finished within `deadline` seconds yield
+        None; those jobs keep running (or get cancelled if they haven't
+        started) without affecting the pool. Hung jobs are handled by the
+        watchdog, so without a deadline this still always returns.
+        """
+        if not htmls:
+            return []
+
+        bounded = [self._bound(html) for html in htmls]
+        chunk_count = min(self.workers, len(bounded))
+        chunk_indexes = [list(range(i, len(bounded), chunk_count)) for i in range(chunk_count)]
+
+        executor = self.executor
+        try:
+            jobs = [
+                executor.submit(_extract_batch, [bounded[i] for i in indexes])
+                for indexes in chunk_indexes
+            ]
+        except BrokenProcessPool:
+            self._recycle(executor)
+            return [None] * len(htmls)
+
+        watchdog = asyncio.create_task(self._watch(
+            executor,
+            [(job, self.timeout * len(indexes)) for job, indexes in zip(jobs, chunk_indexes)]
+        ))
+        self._watchdogs.add(watchdog)
+        watchdog.add_done_callback(self._watchdogs.discard)
+
+        futures = [asyncio.wrap_future(job) for job in jobs]
+        done, pending = await asyncio.wait(futures, timeout=deadline)
+        # Only frees queue slots: jobs already on a worker can't be cancelled
+        for job, future in zip(jobs, futures):
+            if future in pending:
+                job.cancel()
+                # Nobody awaits it any more; a later failure is expected
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        results: List[Optional[str]] = [None] * len(htmls)
+        for future, indexes in zip(futures, chunk_indexes):
+            if future not in done or future.cancelled():
+                continue
+            if future.exception():
+                if isinstance(future.exception(), BrokenProcessPool):
+                    self._recycle(executor)
+                continue
+            for index, content in zip(indexes, future.result()):
+                results[index] = content
+        return results
+
+extraction_engine = ExtractionEngine(
+    workers=EXTRACTION_WORKERS,
+    max_html_chars=EXTRACTION_MAX_HTML_CHARS,
+    timeout=EXTRACTION_TIMEOUT
+)
@@ -0,0 +1,128 @@
+# services/health.py
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import time
+from sqlalchemy import text
+from services.postgres import async_engine
+from services.qdrant import get_async_qdrant_client
+from core.config import HEALTH_CHECK_INTERVAL, HEALTH_CHECK_TIMEOUT, HEALTH_MAX_STALENESS
+
+class HealthChecker:
+    """Dependency checks run on an interval, so probes only read the last result.
+
+    Every check gets `timeout` seconds; the checks run concurrently and one
+    round is shared by everybody who asks for a refresh meanwhile. A result
+    older than `max_staleness` seconds counts as unhealthy, so a stuck
+    checker loop takes the instance out of rotation instead of reporting
+    stale good news.
+    """
+
+    def __init__(
+        self,
+        checks: Dict[str, Callable[[], Awaitable[None]]],
+        interval: float,
+        timeout: float,
+        max_staleness: float
+    ):
+        self.checks = checks
+        self.interval = interval
+        self.timeout = timeout
+        self.max_staleness = max_staleness
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.checked_at: Optional[float] = None
+        self._round: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    async def _run_check(self, name: str, check: Callable[[], Awaitable[None]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), timeout=self.timeout)
+            status, error = "healthy", None
+        except asyncio.TimeoutError:
+            status, error = "unhealthy", f"timed out after {self.timeout:g}s"
+        except Exception as e:
+            status, error = "unhealthy", str(e)
+        result = {
+            "status": status,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+        if error is not None:
+            result["error"] = error
+        return result
+
+    async def _check_all(self) -> Dict[str, Dict[str, Any]]:
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._run_check(name, self.checks[name]) for name in names))
+        self.results = dict(zip(names, results))
+        self.checked_at = time.time()
+        return self.results
+
+    async def refresh(self) -> Dict[str, Dict[str, Any]]:
+        """Run every check now, joining a round that is already in progress"""
+        if self._round is None or self._round.done():
+            self._round = asyncio.create_task(self._check_all())
+        return await asyncio.shield(self._round)
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error running health checks: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        for task in (self._loop_task, self._round):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._loop_task = None
+        self._round = None
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last completed round, None before the first"""
+        if self.checked_at is None:
+            return None
+        return time.time() - self.checked_at
+
+    def is_ready(self) -> bool:
+        age = self.age()
+        if age is None or age > self.max_staleness:
+            return False
+        return all(result["status"] == "healthy" for result in self.results.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        age = self.age()
+        return {
+            "status": "ready" if self.is_ready() else "not_ready",
+            "checked_at": self.checked_at,
+            "age_s": round(age, 2) if age is not None else None,
+            "stale": age is None or age > self.max_staleness,
+            "services": {name: result["status"] for name, result in self.results.items()}
+        }
+
+async def check_postgres():
+    async with async_engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+async def check_qdrant():
+    # A single collection lookup instead of listing every collection
+    if not await get_async_qdrant_client().collection_exists("beauty_consultations"):
+        raise RuntimeError("beauty_consultations collection missing")
+
+def create_health_checker() -> HealthChecker:
+    return HealthChecker(
+        {"postgres": check_postgres, "qdrant": check_qdrant},
+        interval=HEALTH_CHECK_INTERVAL,
+        timeout=HEALTH_CHECK_TIMEOUT,
+        max_staleness=HEALTH_MAX_STALENESS
+    )
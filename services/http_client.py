@@ -0,0 +1,51 @@
+# services/http_client.py
+from typing import Optional
+import aiohttp
+from core.config import (
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_REQUEST_TIMEOUT
+)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+def _create_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        use_dns_cache=True,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        enable_cleanup_closed=True
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT)
+    )
+
+async def init_http_session() -> aiohttp.ClientSession:
+    """Create the shared HTTP session, called once on application startup"""
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+    return _session
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared, pooled HTTP session for outbound requests.
+
+    Must be called from inside a running event loop. Falls back to creating
+    the session lazily when used outside the FastAPI lifecycle (scripts).
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+    return _session
+
+async def close_http_session():
+    """Close the shared HTTP session, called on application shutdown"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
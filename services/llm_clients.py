@@ -0,0 +1,100 @@
+# services/llm_clients.py
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Optional, Tuple
+import httpx
+from core.config import LLM_POOL_LIMIT, LLM_KEEPALIVE_EXPIRY, LLM_REQUEST_TIMEOUT
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+    from langchain_community.llms import Ollama
+
+class LLMClientRegistry:
+    """Long-lived LLM clients shared across requests.
+
+    One client is built per (provider, model, temperature, max_tokens) and
+    reused for every later call with the same settings. All OpenAI clients
+    share a single pooled httpx.AsyncClient, so TLS connections to the
+    provider stay open between chat turns. Options that vary per call
+    (stop sequences, seeds, ...) are passed to `ainvoke`/`astream` instead
+    of creating a new client.
+    """
+
+    def __init__(self, max_connections: int, keepalive_expiry: float, timeout: float):
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self._clients: Dict[Tuple[Hashable, ...], Any] = {}
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                timeout=self.timeout
+            )
+        return self._http_client
+
+    def _get_or_create(self, key: Tuple[Hashable, ...], factory):
+        client = self._clients.get(key)
+        if client is not None:
+            self.hits += 1
+            return client
+        self.misses += 1
+        client = factory()
+        self._clients[key] = client
+        return client
+
+    def openai(
+        self,
+        api_key: str,
+        model: str,
+        temperature: float,
+        max_tokens: Optional[int] = None
+    ) -> "ChatOpenAI":
+        # langchain is imported on first use so importing this module stays cheap
+        from langchain_openai import ChatOpenAI
+
+        # The API key is part of the key so services with different keys never share a client
+        key = ("openai", api_key, model, temperature, max_tokens)
+        return self._get_or_create(key, lambda: ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            openai_api_key=api_key,
+            http_async_client=self._get_http_client()
+        ))
+
+    def ollama(self, base_url: str, model: str, temperature: float) -> "Ollama":
+        from langchain_community.llms import Ollama
+
+        key = ("ollama", base_url, model, temperature)
+        return self._get_or_create(key, lambda: Ollama(
+            base_url=base_url,
+            model=model,
+            temperature=temperature
+        ))
+
+    async def close(self):
+        """Drop all clients and close the shared connection pool"""
+        self._clients.clear()
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+        self._http_client = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+llm_clients = LLMClientRegistry(
+    max_connections=LLM_POOL_LIMIT,
+    keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+    timeout=LLM_REQUEST_TIMEOUT
+)
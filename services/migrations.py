@@ -0,0 +1,134 @@
+# services/migrations.py
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Tuple
+import importlib
+import pkgutil
+import re
+import time
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+import migrations
+
+MIGRATION_NAME = re.compile(r"^(\d{4})_(\w+)$")
+
+# Arbitrary constant shared by every app instance; whoever holds the
+# advisory lock migrates, the others wait and then find nothing to do
+MIGRATION_LOCK_ID = 76000001
+LOCK_POLL_INTERVAL = 0.5
+
+@contextmanager
+def advisory_lock(connection: Connection, lock_id: int) -> Iterator[None]:
+    """Hold a session-level advisory lock, waiting for whoever has it now.
+
+    Waits by polling rather than blocking in pg_advisory_lock: a blocked
+    waiter holds a snapshot, which CREATE INDEX CONCURRENTLY in the lock
+    holder's migration would wait on in turn.
+    """
+    while not try_advisory_lock(connection, lock_id):
+        time.sleep(LOCK_POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        advisory_unlock(connection, lock_id)
+
+def try_advisory_lock(connection: Connection, lock_id: int) -> bool:
+    """Take a session-level advisory lock if nobody holds it; never waits"""
+    acquired = connection.execute(
+        text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": lock_id}
+    ).scalar()
+    connection.commit()
+    return bool(acquired)
+
+def advisory_unlock(connection: Connection, lock_id: int):
+    connection.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": lock_id})
+    connection.commit()
+
+def create_index_concurrently(connection: Connection, name: str, definition: str, unique: bool = False):
+    """Build an index without blocking writes, for migrations with TRANSACTIONAL = False.
+
+    A concurrent build that failed part way leaves an INVALID index behind,
+    which IF NOT EXISTS would take for done, so that one is dropped first.
+    """
+    invalid = connection.execute(
+        text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name}
+    ).scalar()
+    if invalid:
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    connection.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}"
+    ))
+
+def discover_migrations() -> List[Tuple[str, str, ModuleType]]:
+    """All migration modules as (version, name, module), oldest first"""
+    found = []
+    for info in pkgutil.iter_modules(migrations.__path__):
+        match = MIGRATION_NAME.match(info.name)
+        if match:
+            module = importlib.import_module(f"migrations.{info.name}")
+            found.append((match.group(1), match.group(2), module))
+    found.sort(key=lambda migration: migration[0])
+    versions = [version for version, _, _ in found]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return found
+
+def _ensure_migrations_table(connection: Connection):
+    with connection.begin():
+        connection.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR(16) PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """))
+
+def _applied_versions(connection: Connection) -> Dict[str, Any]:
+    with connection.begin():
+        rows = connection.execute(text("SELECT version, applied_at FROM schema_migrations"))
+        return {row.version: row.applied_at for row in rows}
+
+def run_migrations(db_engine: Engine) -> List[str]:
+    """Apply pending migrations in order; returns the ones applied.
+
+    Runs under a Postgres advisory lock so several workers starting at once
+    never apply the same migration twice. Each migration and its
+    bookkeeping row commit together, so a failure leaves the schema at the
+    last good version. Migrations that set `TRANSACTIONAL = False` (to
+    create indexes concurrently) run in autocommit instead and must be safe
+    to re-run after failing half way; only their bookkeeping row is
+    written once they succeed.
+    """
+    applied_now = []
+    with db_engine.connect() as connection, advisory_lock(connection, MIGRATION_LOCK_ID):
+        _ensure_migrations_table(connection)
+        applied = _applied_versions(connection)
+        for version, name, module in discover_migrations():
+            if version in applied:
+                continue
+            transactional = getattr(module, "TRANSACTIONAL", True)
+            if not transactional:
+                # CREATE INDEX CONCURRENTLY refuses to run inside a transaction
+                with db_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as autocommit:
+                    module.upgrade(autocommit)
+            with connection.begin():
+                if transactional:
+                    module.upgrade(connection)
+                connection.execute(
+                    text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                    {"version": version, "name": name}
+                )
+            print(f"Applied migration {version}_{name}")
+            applied_now.append(f"{version}_{name}")
+    return applied_now
+
+def migration_status(db_engine: Engine) -> List[Dict[str, Any]]:
+    """Every known migration with the time it was applied (None if pending)"""
+    with db_engine.connect() as connection:
+        _ensure_migrations_table(connection)
+        applied = _applied_versions(connection)
+    return [
+        {"version": version, "name": name, "applied_at": applied.get(version)}
+        for version, name, _ in discover_migrations()
+    ]
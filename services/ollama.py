@@ -1,11 +1,11 @@
 # services/ollama.py
-from langchain_community.llms import Ollama
 from langchain_community.embeddings import OllamaEmbeddings
-from langchain.callbacks import AsyncIteratorCallbackHandler
-from typing import AsyncIterator, Dict, Any, List
-import asyncio
-import uuid
-from datetime import datetime
+from services.embedding_cache import embedding_cache
+from services.embedding_batcher import EmbeddingBatcher, embed_queries
+from services.llm_clients import llm_clients
+from services.streaming import SSEStreamEncoder, create_stream_encoder
+from core.config import EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_WAIT_MS
+from typing import AsyncIterator, Dict, Any, List, Optional
 
 class OllamaService:
     def __init__(self, base_url: str, model_name: str):
@@ -15,94 +15,61 @@ class OllamaService:
             base_url=base_url,
             model=model_name
         )
+        # OllamaEmbeddings prefixes queries and documents with different
+        # instructions, so lookups must stay on the query path
+        self.embedding_batcher = EmbeddingBatcher(
+            embed_queries(self.embeddings),
+            max_batch_size=EMBEDDING_BATCH_SIZE,
+            max_wait_ms=EMBEDDING_BATCH_WAIT_MS,
+            name="ollama_embeddings"
+        )
 
     async def get_embeddings(self, text: str) -> List[float]:
-        """Get embeddings for text"""
-        return await asyncio.to_thread(
-            self.embeddings.embed_query,
-            text
+        """Get embeddings for text, reusing cached vectors for identical text"""
+        return await embedding_cache.get_or_compute(
+            # Kept apart from the bare model name, under which document-path
+            # vectors may already be cached
+            f"{self.embeddings.model}:query",
+            text,
+            self._embed_query
         )
 
-    def format_sse(self, event: str, data: Any) -> str:
-        """Format the data as SSE message with event type"""
-        json_data = {
-            "message_id": f'message-{uuid.uuid4()}',
-            "type": "message",
-            "content": data,
-        }
-        
-        if event == "start" or event == "done" or event == "error":
-            edge_json = {
-                "event": event.upper(),
-                "content": data,
-            }
-            return f"data: {json_data}\n\n"
-        
-        return f"data: {json_data}\n\n"
-
-    async def accumulate_chunks(self, current_chunk: List[str], buffer_size: int = 150) -> str:
-        """Accumulate chunks until they form a meaningful segment"""
-        text = ''.join(current_chunk).strip()
-        if not text:
-            return None
-            
-        # If text ends with sentence-ending punctuation or is longer than buffer_size
-        if (text[-1] in '.!?' or len(text) >= buffer_size):
-            return text
-        return None
+    async def _embed_query(self, text: str) -> List[float]:
+        return await self.embedding_batcher.embed(text)
 
     async def chat_stream(
         self, 
         messages: List[Dict[str, Any]], 
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        encoder: Optional[SSEStreamEncoder] = None
     ) -> AsyncIterator[str]:
         """Stream chat completions with proper SSE format"""
+        encoder = encoder or create_stream_encoder()
         try:
-            callback_handler = AsyncIteratorCallbackHandler()
-            llm = Ollama(
-                base_url=self.base_url,
-                model=self.model_name,
-                streaming=True,
-                callbacks=[callback_handler],
-                temperature=temperature
-            )
+            llm = llm_clients.ollama(self.base_url, self.model_name, temperature)
 
-            current_chunk = []
-            full_response = []
-            
             # Send start message
-            yield self.format_sse("start", "Starting response...")
+            yield encoder.start("Starting response...")
             
             # Convert messages to prompt format that Ollama expects
             prompt = self._convert_messages_to_prompt(messages)
             
             async for chunk in llm.astream(prompt):
-                if chunk:
-                    token = chunk
-                    current_chunk.append(token)
-                    full_response.append(token)
-                    
-                    # Try to accumulate meaningful chunks
-                    accumulated_text = await self.accumulate_chunks(current_chunk)
-                    if accumulated_text:
-                        yield self.format_sse("chunk", accumulated_text)
-                        current_chunk = []
+                sse_chunk = encoder.push(chunk)
+                if sse_chunk:
+                    yield sse_chunk
 
             # Send any remaining text
-            remaining_text = ''.join(current_chunk).strip()
-            if remaining_text:
-                yield self.format_sse("chunk", remaining_text)
+            remaining = encoder.flush()
+            if remaining:
+                yield remaining
 
             # Send complete response
-            complete_response = ''.join(full_response)
-            yield self.format_sse("final", complete_response)
-            yield self.format_sse("done", "Response completed")
+            yield encoder.final()
+            yield encoder.done()
 
         except Exception as e:
-            yield self.format_sse("error", str(e))
-        finally:
-            if 'callback_handler' in locals():
-                callback_handler.done.set()
+            yield encoder.error(str(e))
 
     def _convert_messages_to_prompt(self, messages: List[Dict[str, Any]]) -> str:
         """Convert chat messages to Ollama prompt format"""
@@ -127,12 +94,7 @@ class OllamaService:
     ) -> str:
         """Get single chat completion response"""
         try:
-            llm = Ollama(
-                base_url=self.base_url,
-                model=self.model_name,
-                streaming=False,
-                temperature=temperature
-            )
+            llm = llm_clients.ollama(self.base_url, self.model_name, temperature)
             
             # Convert messages to prompt format
             prompt = self._convert_messages_to_prompt(messages)
@@ -1,52 +1,57 @@
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain.callbacks import AsyncIteratorCallbackHandler
+from langchain_openai import OpenAIEmbeddings
 from langchain.schema import SystemMessage, HumanMessage, AIMessage
 from services.search_api import SourceExtractorService
-from typing import AsyncIterator, Dict, Any, List
+from services.context_builder import ContextBuilder
+from services.retrieval_gate import RetrievalGate
+from services.embedding_cache import embedding_cache
+from services.embedding_batcher import EmbeddingBatcher
+from services.llm_clients import llm_clients
+from services.streaming import SSEStreamEncoder, create_stream_encoder
+from core.config import (
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_PASSAGE_CHARS,
+    RETRIEVAL_GATE_ENABLED,
+    RETRIEVAL_GATE_THRESHOLD,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_BATCH_WAIT_MS
+)
+from typing import AsyncIterator, Dict, Any, List, Optional
 import asyncio
-import json, uuid
-from datetime import datetime
+import time
 
 class OpenAiService:
     def __init__(self, api_key: str, model_name: str):
         self.api_key = api_key
         self.model_name = model_name
         self.embeddings = OpenAIEmbeddings(openai_api_key=api_key)
+        # langchain_openai's embed_query is embed_documents([text])[0], so
+        # batching through embed_documents yields the same query vectors
+        self.embedding_batcher = EmbeddingBatcher(
+            self.embeddings.embed_documents,
+            max_batch_size=EMBEDDING_BATCH_SIZE,
+            max_wait_ms=EMBEDDING_BATCH_WAIT_MS,
+            name="openai_embeddings"
+        )
         self.source_extractor = SourceExtractorService()
+        self.context_builder = ContextBuilder(
+            token_budget=CONTEXT_TOKEN_BUDGET,
+            passage_chars=CONTEXT_PASSAGE_CHARS
+        )
+        self.retrieval_gate = RetrievalGate(
+            threshold=RETRIEVAL_GATE_THRESHOLD,
+            enabled=RETRIEVAL_GATE_ENABLED
+        )
 
     async def get_embeddings(self, text: str) -> List[float]:
-        """Get embeddings for text"""
-        return await asyncio.to_thread(
-            self.embeddings.embed_query,
-            text
+        """Get embeddings for text, reusing cached vectors for identical text"""
+        return await embedding_cache.get_or_compute(
+            self.embeddings.model,
+            text,
+            self._embed_query
         )
 
-    def format_sse(self, event: str, data: Any) -> str:
-        """Format the data as SSE message with event type"""
-        json_data = {
-            "message_id": f'message-{uuid.uuid4()}',
-            "type": "message",
-            "content": data,
-        }
-        
-        if event == "start" or event == "done" or event == "error":
-            edge_json = {
-                "event": event.upper(),
-                "content": data,
-            }
-            return f"data: {edge_json}\n\n"
-        
-        return f"data: {json_data}\n\n"
-
-    async def accumulate_chunks(self, current_chunk: List[str], buffer_size: int = 150) -> str:
-        """Accumulate chunks until they form a meaningful segment"""
-        text = ''.join(current_chunk).strip()
-        if not text:
-            return None
-            
-        if (text[-1] in '.!?' or len(text) >= buffer_size):
-            return text
-        return None
+    async def _embed_query(self, text: str) -> List[float]:
+        return await self.embedding_batcher.embed(text)
 
     async def get_last_user_message(self, messages: List[Any]) -> str:
         """Extract the last user message from various message formats"""
@@ -59,6 +64,16 @@ class OpenAiService:
                 return msg.content
         return ""
 
+    def get_previous_user_messages(self, messages: List[Any]) -> List[str]:
+        """User messages before the latest one, oldest first"""
+        user_messages = [
+            msg.content if not isinstance(msg, dict) else msg["content"]
+            for msg in messages
+            if isinstance(msg, HumanMessage)
+            or (isinstance(msg, dict) and msg.get("role") == "user")
+        ]
+        return user_messages[:-1]
+
     async def enhance_messages_with_context(
         self,
         messages: List[Any]
@@ -67,10 +82,26 @@ class OpenAiService:
         try:
             # Get the latest user message
             user_message = await self.get_last_user_message(messages)
+
+            # Skip the web search for small talk and questions the
+            # conversation already answers
+            decision = self.retrieval_gate.decide(
+                user_message,
+                self.get_previous_user_messages(messages)
+            )
+            print(f"Retrieval gate: {decision}")
+            if not decision["needs_retrieval"]:
+                return messages
             
             # Get context from sources
+            started = time.perf_counter()
             sources = await self.source_extractor.get_source_context(user_message)
-            context = self.source_extractor.format_context_for_prompt(sources)
+            self.retrieval_gate.record_retrieval((time.perf_counter() - started) * 1000)
+            context, stats = self.context_builder.build(user_message, sources)
+            print(
+                f"Context: {stats['passages_sent']}/{stats['passages_total']} passages, "
+                f"{stats['tokens_sent']} tokens sent, {stats['tokens_saved']} saved"
+            )
             
             # Create new system message with context
             system_content = (
@@ -80,11 +111,16 @@ class OpenAiService:
                 f"{context}\n\n"
             )
             
-            # Filter out existing system messages and keep other messages
+            # Keep the caller's system prompts (profile, conversation summary)
+            # ahead of the source context, and the other messages after it
+            system_prompts = []
             enhanced_messages = []
             for msg in messages:
-                if not (isinstance(msg, SystemMessage) or 
-                       (isinstance(msg, dict) and msg.get("role") == "system")):
+                if isinstance(msg, SystemMessage):
+                    system_prompts.append(msg.content)
+                elif isinstance(msg, dict) and msg.get("role") == "system":
+                    system_prompts.append(msg["content"])
+                else:
                     if isinstance(msg, (HumanMessage, AIMessage)):
                         enhanced_messages.append(msg)
                     elif isinstance(msg, dict):
@@ -94,6 +130,8 @@ class OpenAiService:
                             enhanced_messages.append(AIMessage(content=msg["content"]))
             
             # Add new system message at the beginning
+            if system_prompts:
+                system_content = "\n\n".join(system_prompts) + "\n\n" + system_content
             return [SystemMessage(content=system_content)] + enhanced_messages
             
         except Exception as e:
@@ -103,55 +141,51 @@ class OpenAiService:
     async def chat_stream(
         self, 
         messages: List[Any], 
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        encoder: Optional[SSEStreamEncoder] = None
     ) -> AsyncIterator[str]:
-        """Stream chat completions with proper SSE format"""
+        """Stream chat completions with proper SSE format.
+
+        Pass an encoder to read the complete response (`encoder.text`) once
+        the stream is exhausted.
+        """
+        encoder = encoder or create_stream_encoder()
         try:
+            # Send start message
+            yield encoder.start("Gathering information...")
+
             # First enhance messages with context
             enhanced_messages = await self.enhance_messages_with_context(messages)
             
-            callback_handler = AsyncIteratorCallbackHandler()
-            llm = ChatOpenAI(
-                streaming=True,
-                callbacks=[callback_handler],
-                temperature=temperature,
-                model=self.model_name,
-                openai_api_key=self.api_key,
-                max_tokens=1000
-            )
+            llm = llm_clients.openai(self.api_key, self.model_name, temperature, max_tokens=1000)
 
-            current_chunk = []
-            full_response = []
-            
-            # Send start message
-            yield self.format_sse("start", "Gathering information...")
-            
             async for chunk in llm.astream(enhanced_messages):
-                if hasattr(chunk, 'content'):
-                    token = chunk.content
-                    current_chunk.append(token)
-                    full_response.append(token)
-                    
-                    accumulated_text = await self.accumulate_chunks(current_chunk)
-                    if accumulated_text:
-                        yield self.format_sse("chunk", accumulated_text)
-                        current_chunk = []
+                sse_chunk = encoder.push(chunk.content)
+                if sse_chunk:
+                    yield sse_chunk
 
             # Send any remaining text
-            remaining_text = ''.join(current_chunk).strip()
-            if remaining_text:
-                yield self.format_sse("chunk", remaining_text)
+            remaining = encoder.flush()
+            if remaining:
+                yield remaining
 
             # Send complete response
-            complete_response = ''.join(full_response)
-            yield self.format_sse("final", complete_response)
-            yield self.format_sse("done", "Response completed")
+            yield encoder.final()
+            yield encoder.done()
+            print(f"Chat stream {encoder.message_id}: {encoder.metrics()}")
 
         except Exception as e:
-            yield self.format_sse("error", str(e))
-        finally:
-            if 'callback_handler' in locals():
-                callback_handler.done.set()
+            yield encoder.error(str(e))
+
+    async def complete(
+        self,
+        messages: List[Any],
+        temperature: float = 0.0
+    ) -> str:
+        """Plain completion of the given messages, without web context"""
+        llm = llm_clients.openai(self.api_key, self.model_name, temperature)
+        response = await llm.ainvoke(messages)
+        return response.content
 
     async def chat_completion(
         self, 
@@ -163,12 +197,7 @@ class OpenAiService:
             # First enhance messages with context
             enhanced_messages = await self.enhance_messages_with_context(messages)
             
-            llm = ChatOpenAI(
-                streaming=False,
-                temperature=temperature,
-                model=self.model_name,
-                openai_api_key=self.api_key
-            )
+            llm = llm_clients.openai(self.api_key, self.model_name, temperature)
             response = await llm.ainvoke(enhanced_messages)
             return response.content
         except Exception as e:
@@ -1,15 +1,59 @@
+from typing import AsyncIterator
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from core.config import POSTGRES_URL
+from core.config import (
+    POSTGRES_URL,
+    POSTGRES_ASYNC_URL,
+    POSTGRES_POOL_SIZE,
+    POSTGRES_MAX_OVERFLOW,
+    POSTGRES_POOL_TIMEOUT,
+    POSTGRES_POOL_RECYCLE,
+    POSTGRES_POOL_PRE_PING,
+    POSTGRES_STATEMENT_CACHE_SIZE
+)
 
-engine = create_engine(POSTGRES_URL)
+POOL_SETTINGS = dict(
+    pool_size=POSTGRES_POOL_SIZE,
+    max_overflow=POSTGRES_MAX_OVERFLOW,
+    pool_timeout=POSTGRES_POOL_TIMEOUT,
+    pool_recycle=POSTGRES_POOL_RECYCLE,
+    pool_pre_ping=POSTGRES_POOL_PRE_PING
+)
+
+# Synchronous engine, for migrations, COPY bulk loads and libraries that need
+# a sync engine (langchain's SQLDatabase). Use it from threads, not from
+# async code.
+engine = create_engine(POSTGRES_URL, **POOL_SETTINGS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# asyncpg engine for everything running on the event loop
+async_engine = create_async_engine(
+    POSTGRES_ASYNC_URL,
+    **POOL_SETTINGS,
+    connect_args={
+        # SQLAlchemy's per-connection prepared statement cache and asyncpg's own
+        "prepared_statement_cache_size": POSTGRES_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": POSTGRES_STATEMENT_CACHE_SIZE
+    }
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency yielding a session on the async engine"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def close_engines():
+    """Dispose both connection pools, called on application shutdown"""
+    await async_engine.dispose()
+    engine.dispose()
@@ -0,0 +1,451 @@
+# services/product_search.py
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import time
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    MatchValue,
+    PayloadSchemaType,
+    PointIdsList,
+    PointStruct,
+    Range,
+    VectorParams
+)
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from services.embedding_cache import embedding_cache
+from services.embedding_batcher import EmbeddingBatcher
+from services.postgres import engine
+from services.migrations import advisory_unlock, try_advisory_lock
+from services.qdrant import ensure_collection, get_async_qdrant_client
+from models.product import Product
+from core.config import (
+    OPENAI_API_KEY,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_BATCH_WAIT_MS,
+    PRODUCT_SEARCH_COLLECTION,
+    PRODUCT_SEARCH_CANDIDATES,
+    PRODUCT_SEARCH_RRF_K
+)
+
+if TYPE_CHECKING:
+    from langchain_openai import OpenAIEmbeddings
+
+PRODUCT_COLUMNS = "id, product_name, brand, price, price_value, rating, description, link"
+SEARCH_MODES = ("hybrid", "lexical", "semantic")
+# Held while a sync runs, so concurrently starting workers don't all embed
+# the same stale products into the shared collection
+PRODUCT_SYNC_LOCK_ID = 76000002
+# Products read from Postgres, or points scrolled from Qdrant, per sync step
+SYNC_PAGE_SIZE = 1000
+
+def product_document(product_name: Optional[str], description: Optional[str]) -> str:
+    """Text that gets embedded for a product"""
+    return f"{product_name or ''}\n{description or ''}".strip()
+
+def content_hash(product: Dict[str, Any]) -> str:
+    """Fingerprint of everything stored in the vector index for a product"""
+    fingerprint = "\x1f".join([
+        product_document(product["product_name"], product["description"]),
+        product["brand"] or "",
+        repr(product["price_value"]),
+        repr(product["rating"])
+    ])
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+class ProductSearchEngine:
+    """Hybrid lexical + semantic search over the products table.
+
+    The lexical side is a generated, GIN-indexed tsvector column ranked
+    with ts_rank_cd; the semantic side is a Qdrant collection holding one
+    embedding of name + description per product, with brand, price_value
+    and rating in the payload for filtering. Both rankings are fused with
+    reciprocal rank fusion and the winners are read back from Postgres.
+
+    The vector index is kept in step incrementally: committed inserts,
+    updates and deletes of Product rows are picked up by session event
+    hooks and applied in the background, and `sync()` re-embeds only
+    products whose indexed fields changed since they were indexed.
+    """
+
+    def __init__(
+        self,
+        client: AsyncQdrantClient,
+        db_engine: Engine,
+        embeddings: "OpenAIEmbeddings",
+        collection_name: str = "products",
+        vector_size: int = 1536,
+        candidates: int = 50,
+        rrf_k: int = 60
+    ):
+        self.client = client
+        self.db_engine = db_engine
+        self.embeddings = embeddings
+        self.collection_name = collection_name
+        self.vector_size = vector_size
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        # Same vectors as embed_query for OpenAIEmbeddings, see OpenAiService
+        self.query_batcher = EmbeddingBatcher(
+            embeddings.embed_documents,
+            max_batch_size=EMBEDDING_BATCH_SIZE,
+            max_wait_ms=EMBEDDING_BATCH_WAIT_MS,
+            name="product_query_embeddings"
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Set[int] = set()
+        self._deleted: Set[int] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._sync_task: Optional[asyncio.Task] = None
+
+    async def init(self):
+        """Make sure the vector collection and its payload indexes exist.
+
+        The lexical side (search_vector column and GIN index) is created by
+        the schema migrations.
+        """
+        if await ensure_collection(
+            self.client,
+            self.collection_name,
+            vectors_config=VectorParams(size=self.vector_size, distance=Distance.COSINE)
+        ):
+            print(f"Collection {self.collection_name} successfully initialized")
+        for field_name in ("price_value", "rating"):
+            await self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field_name,
+                field_schema=PayloadSchemaType.FLOAT
+            )
+        await self.client.create_payload_index(
+            collection_name=self.collection_name,
+            field_name="brand",
+            field_schema=PayloadSchemaType.KEYWORD
+        )
+        self._loop = asyncio.get_running_loop()
+
+    # Indexing
+
+    def _fetch_products(self, ids: Iterable[int]) -> List[Dict[str, Any]]:
+        query = f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id = ANY(:ids)"
+        with self.db_engine.connect() as connection:
+            return [dict(row._mapping) for row in connection.execute(text(query), {"ids": list(ids)})]
+
+    def _fetch_product_page(self, after_id: int, limit: int) -> List[Dict[str, Any]]:
+        """The next `limit` products by id, for walking the table without an OFFSET"""
+        query = f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id > :after_id ORDER BY id LIMIT :limit"
+        with self.db_engine.connect() as connection:
+            rows = connection.execute(text(query), {"after_id": after_id, "limit": limit})
+            return [dict(row._mapping) for row in rows]
+
+    def _existing_ids(self, ids: List[int]) -> Set[int]:
+        with self.db_engine.connect() as connection:
+            rows = connection.execute(text("SELECT id FROM products WHERE id = ANY(:ids)"), {"ids": ids})
+            return {row.id for row in rows}
+
+    async def _indexed_hashes(self, ids: List[int]) -> Dict[int, str]:
+        points = await self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=ids,
+            with_payload=["content_hash"],
+            with_vectors=False
+        )
+        return {int(point.id): point.payload.get("content_hash") for point in points}
+
+    async def index_products(self, products: List[Dict[str, Any]]):
+        """Embed and upsert the given product rows in batches"""
+        for start in range(0, len(products), EMBEDDING_BATCH_SIZE):
+            batch = products[start:start + EMBEDDING_BATCH_SIZE]
+            documents = [product_document(p["product_name"], p["description"]) for p in batch]
+            vectors = await asyncio.to_thread(self.embeddings.embed_documents, documents)
+            await self.client.upsert(
+                collection_name=self.collection_name,
+                points=[
+                    PointStruct(
+                        id=product["id"],
+                        vector=vector,
+                        payload={
+                            "brand": (product["brand"] or "").lower(),
+                            "price_value": product["price_value"],
+                            "rating": product["rating"],
+                            "content_hash": content_hash(product)
+                        }
+                    )
+                    for product, document, vector in zip(batch, documents, vectors)
+                ]
+            )
+
+    async def remove_products(self, ids: Iterable[int]):
+        ids = list(ids)
+        if ids:
+            await self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=ids)
+            )
+
+    async def index_ids(self, ids: Iterable[int]):
+        """Re-embed the given products, e.g. rows a COPY load changed behind the ORM's back"""
+        ids = list(ids)
+        for start in range(0, len(ids), SYNC_PAGE_SIZE):
+            products = await asyncio.to_thread(self._fetch_products, ids[start:start + SYNC_PAGE_SIZE])
+            await self.index_products(products)
+
+    async def sync(self) -> Optional[Dict[str, int]]:
+        """Bring the vector index in line with the table, re-indexing only what changed.
+
+        Returns None without doing anything when another process is already
+        syncing; a later sync then finds the index up to date and embeds nothing.
+        """
+        connection = await asyncio.to_thread(self.db_engine.connect)
+        try:
+            if not await asyncio.to_thread(try_advisory_lock, connection, PRODUCT_SYNC_LOCK_ID):
+                print("Product search index sync already running elsewhere, skipping")
+                return None
+            try:
+                return await self._sync()
+            finally:
+                await asyncio.to_thread(advisory_unlock, connection, PRODUCT_SYNC_LOCK_ID)
+        finally:
+            await asyncio.to_thread(connection.close)
+
+    async def _sync(self) -> Dict[str, int]:
+        # Both sides are walked a page at a time, so memory stays flat
+        # however large the catalog is
+        result = {"products": 0, "indexed": 0, "removed": 0}
+        after_id = 0
+        while True:
+            products = await asyncio.to_thread(self._fetch_product_page, after_id, SYNC_PAGE_SIZE)
+            if not products:
+                break
+            indexed = await self._indexed_hashes([product["id"] for product in products])
+            stale = [
+                product for product in products
+                if indexed.get(product["id"]) != content_hash(product)
+            ]
+            await self.index_products(stale)
+            result["products"] += len(products)
+            result["indexed"] += len(stale)
+            after_id = products[-1]["id"]
+
+        # Points whose product row is gone
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=self.collection_name,
+                limit=SYNC_PAGE_SIZE,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False
+            )
+            ids = [int(point.id) for point in points]
+            existing = await asyncio.to_thread(self._existing_ids, ids) if ids else set()
+            removed = [point_id for point_id in ids if point_id not in existing]
+            await self.remove_products(removed)
+            result["removed"] += len(removed)
+            if offset is None:
+                break
+
+        print(f"Product search index synced: {result}")
+        return result
+
+    def schedule_sync(self):
+        """Run sync() in the background so startup doesn't wait on embeddings"""
+        async def run():
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"Error syncing product search index: {str(e)}")
+        self._sync_task = asyncio.ensure_future(run())
+
+    def mark_changed(self, changed: Set[int], deleted: Set[int]):
+        """Queue committed product changes; safe to call from any thread"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._queue_changes, changed, deleted)
+
+    def _queue_changes(self, changed: Set[int], deleted: Set[int]):
+        self._changed |= changed - deleted
+        self._changed -= deleted
+        self._deleted |= deleted
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_changes())
+
+    async def _flush_changes(self):
+        while self._changed or self._deleted:
+            changed, self._changed = self._changed, set()
+            deleted, self._deleted = self._deleted, set()
+            try:
+                await self.index_ids(changed)
+                await self.remove_products(deleted)
+            except Exception as e:
+                print(f"Error updating product search index: {str(e)}")
+
+    # Search
+
+    def _lexical_search(
+        self,
+        query: str,
+        limit: int,
+        filters: Dict[str, Optional[float]]
+    ) -> List[int]:
+        conditions, params = ["search_vector @@ tsq"], {"q": query, "limit": limit}
+        if filters["min_price"] is not None:
+            conditions.append("price_value >= :min_price")
+            params["min_price"] = filters["min_price"]
+        if filters["max_price"] is not None:
+            conditions.append("price_value <= :max_price")
+            params["max_price"] = filters["max_price"]
+        if filters["min_rating"] is not None:
+            conditions.append("rating >= :min_rating")
+            params["min_rating"] = filters["min_rating"]
+        if filters["brand"] is not None:
+            conditions.append("lower(brand) = :brand")
+            params["brand"] = filters["brand"].lower()
+        sql = text(
+            "SELECT id FROM products, websearch_to_tsquery('english', :q) AS tsq "
+            f"WHERE {' AND '.join(conditions)} "
+            "ORDER BY ts_rank_cd(search_vector, tsq) DESC, rating DESC NULLS LAST "
+            "LIMIT :limit"
+        )
+        with self.db_engine.connect() as connection:
+            return [row.id for row in connection.execute(sql, params)]
+
+    async def _embed_query(self, query: str) -> List[float]:
+        return await embedding_cache.get_or_compute(
+            self.embeddings.model,
+            query,
+            self.query_batcher.embed
+        )
+
+    async def _semantic_search(
+        self,
+        query: str,
+        limit: int,
+        filters: Dict[str, Optional[float]]
+    ) -> List[int]:
+        conditions = []
+        if filters["min_price"] is not None or filters["max_price"] is not None:
+            conditions.append(FieldCondition(
+                key="price_value",
+                range=Range(gte=filters["min_price"], lte=filters["max_price"])
+            ))
+        if filters["min_rating"] is not None:
+            conditions.append(FieldCondition(key="rating", range=Range(gte=filters["min_rating"])))
+        if filters["brand"] is not None:
+            conditions.append(FieldCondition(key="brand", match=MatchValue(value=filters["brand"].lower())))
+        result = await self.client.query_points(
+            collection_name=self.collection_name,
+            query=await self._embed_query(query),
+            query_filter=Filter(must=conditions) if conditions else None,
+            limit=limit,
+            with_payload=False,
+            with_vectors=False
+        )
+        return [int(point.id) for point in result.points]
+
+    def fuse(self, rankings: List[List[int]]) -> List[Tuple[int, float]]:
+        """Reciprocal rank fusion of several ranked id lists"""
+        scores: Dict[int, float] = {}
+        for ranking in rankings:
+            for rank, product_id in enumerate(ranking, start=1):
+                scores[product_id] = scores.get(product_id, 0.0) + 1.0 / (self.rrf_k + rank)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        brand: Optional[str] = None,
+        mode: str = "hybrid"
+    ) -> Dict[str, Any]:
+        """Search products; returns the ranked rows with their fused scores"""
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        started = time.perf_counter()
+        filters = {
+            "min_price": min_price,
+            "max_price": max_price,
+            "min_rating": min_rating,
+            "brand": brand
+        }
+        candidates = max(limit, self.candidates)
+
+        legs = []
+        if mode in ("hybrid", "lexical"):
+            legs.append(asyncio.to_thread(self._lexical_search, query, candidates, filters))
+        if mode in ("hybrid", "semantic"):
+            legs.append(self._semantic_search(query, candidates, filters))
+        results = await asyncio.gather(*legs, return_exceptions=True)
+
+        rankings = []
+        for result in results:
+            if isinstance(result, Exception):
+                # One failing leg (e.g. Qdrant down) still leaves usable results
+                print(f"Product search leg failed: {str(result)}")
+            else:
+                rankings.append(result)
+        if not rankings:
+            raise results[0]
+
+        fused = self.fuse(rankings)[:limit]
+        rows = await asyncio.to_thread(self._fetch_products, [product_id for product_id, _ in fused])
+        by_id = {row["id"]: row for row in rows}
+        products = [
+            {**by_id[product_id], "score": round(score, 6)}
+            for product_id, score in fused
+            if product_id in by_id
+        ]
+        return {
+            "query": query,
+            "mode": mode,
+            "results": products,
+            "took_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+def _watch_product_changes(search_engine: ProductSearchEngine):
+    """Forward committed Product inserts/updates/deletes to the search index"""
+
+    @event.listens_for(Session, "after_flush")
+    def collect(session, flush_context):
+        changed = session.info.setdefault("product_search_changed", set())
+        deleted = session.info.setdefault("product_search_deleted", set())
+        for obj in session.new | session.dirty:
+            if isinstance(obj, Product) and obj.id is not None:
+                changed.add(obj.id)
+        for obj in session.deleted:
+            if isinstance(obj, Product) and obj.id is not None:
+                deleted.add(obj.id)
+
+    @event.listens_for(Session, "after_commit")
+    def forward(session):
+        changed = session.info.pop("product_search_changed", set())
+        deleted = session.info.pop("product_search_deleted", set())
+        if changed or deleted:
+            search_engine.mark_changed(changed, deleted)
+
+    @event.listens_for(Session, "after_rollback")
+    def discard(session):
+        session.info.pop("product_search_changed", None)
+        session.info.pop("product_search_deleted", None)
+
+def create_product_search() -> ProductSearchEngine:
+    """Build the configured search engine and hook it up to Product changes"""
+    from langchain_openai import OpenAIEmbeddings
+
+    search_engine = ProductSearchEngine(
+        get_async_qdrant_client(),
+        engine,
+        OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY),
+        collection_name=PRODUCT_SEARCH_COLLECTION,
+        candidates=PRODUCT_SEARCH_CANDIDATES,
+        rrf_k=PRODUCT_SEARCH_RRF_K
+    )
+    _watch_product_changes(search_engine)
+    return search_engine
@@ -1,35 +1,79 @@
 # services/qdrant.py
-from qdrant_client import QdrantClient
+from typing import Optional
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from qdrant_client.models import Distance, VectorParams, CollectionStatus
 from qdrant_client.http.exceptions import UnexpectedResponse
-from core.config import QDRANT_HOST, QDRANT_PORT
-import time
+from core.config import QDRANT_HOST, QDRANT_PORT, QDRANT_GRPC_PORT, QDRANT_PREFER_GRPC
+import asyncio
 
-def get_qdrant_client():
-    return QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+_client: Optional[QdrantClient] = None
+_async_client: Optional[AsyncQdrantClient] = None
 
-def init_collection(collection_name: str, vector_size: int = 1536, max_retries: int = 3):
-    """Initialize a Qdrant collection with retry logic"""
-    client = get_qdrant_client()
+def get_qdrant_client() -> QdrantClient:
+    """Shared synchronous client, for scripts and other non-async callers"""
+    global _client
+    if _client is None:
+        _client = QdrantClient(
+            host=QDRANT_HOST,
+            port=QDRANT_PORT,
+            grpc_port=QDRANT_GRPC_PORT,
+            prefer_grpc=QDRANT_PREFER_GRPC
+        )
+    return _client
+
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """Shared async client; reuses one connection pool (REST or gRPC) per process"""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncQdrantClient(
+            host=QDRANT_HOST,
+            port=QDRANT_PORT,
+            grpc_port=QDRANT_GRPC_PORT,
+            prefer_grpc=QDRANT_PREFER_GRPC
+        )
+    return _async_client
+
+async def close_qdrant_clients():
+    """Close the shared clients, called on application shutdown"""
+    global _client, _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+    if _client is not None:
+        _client.close()
+        _client = None
+
+async def ensure_collection(client: AsyncQdrantClient, collection_name: str, **create_kwargs) -> bool:
+    """Create a collection unless it exists; returns True if this call created it.
+
+    Every worker runs this on startup at the same time, so losing the race
+    to create the collection counts as success rather than an error.
+    """
+    if await client.collection_exists(collection_name):
+        return False
+    try:
+        await client.create_collection(collection_name=collection_name, **create_kwargs)
+    except Exception:
+        # Whatever the transport's error looks like, another worker winning
+        # the race leaves the collection in place
+        if await client.collection_exists(collection_name):
+            return False
+        raise
+    return True
+
+async def init_collection(collection_name: str, vector_size: int = 1536, max_retries: int = 3):
+    """Initialize a Qdrant collection with retry logic.
+
+    An existing collection is never recreated: a non-GREEN status only means
+    it is still optimizing (or was just created by another worker).
+    """
+    client = get_async_qdrant_client()
     
     for attempt in range(max_retries):
         try:
-            # Check if collection exists
-            collections = client.get_collections()
-            exists = any(col.name == collection_name for col in collections.collections)
-            
-            if exists:
-                # Get collection info to check status
-                collection_info = client.get_collection(collection_name)
-                if collection_info.status == CollectionStatus.GREEN:
-                    print(f"Collection {collection_name} already exists and is healthy")
-                    return client
-                else:
-                    print(f"Collection {collection_name} exists but status is {collection_info.status}")
-            
-            # Create or recreate collection
-            client.recreate_collection(
-                collection_name=collection_name,
+            created = await ensure_collection(
+                client,
+                collection_name,
                 vectors_config=VectorParams(
                     size=vector_size,
                     distance=Distance.COSINE
@@ -38,22 +82,27 @@ def init_collection(collection_name: str, vector_size: int = 1536, max_retries:
             
             # Wait for collection to be ready
             for _ in range(5):  # Check status up to 5 times
-                collection_info = client.get_collection(collection_name)
+                collection_info = await client.get_collection(collection_name)
                 if collection_info.status == CollectionStatus.GREEN:
-                    print(f"Collection {collection_name} successfully initialized")
+                    if created:
+                        print(f"Collection {collection_name} successfully initialized")
+                    else:
+                        print(f"Collection {collection_name} already exists and is healthy")
                     return client
-                time.sleep(1)  # Wait before checking again
-                
-            raise Exception(f"Collection {collection_name} not ready after initialization")
+                await asyncio.sleep(1)  # Wait before checking again
+            
+            # Still optimizing; it stays usable meanwhile
+            print(f"Collection {collection_name} status is {collection_info.status}, continuing")
+            return client
             
         except UnexpectedResponse as e:
             if attempt < max_retries - 1:
                 print(f"Attempt {attempt + 1} failed, retrying...")
-                time.sleep(2 ** attempt)  # Exponential backoff
+                await asyncio.sleep(2 ** attempt)  # Exponential backoff
                 continue
             raise Exception(f"Failed to initialize collection after {max_retries} attempts: {str(e)}")
             
         except Exception as e:
             raise Exception(f"Error initializing collection: {str(e)}")
     
-    return client
\ No newline at end of file
+    return client
@@ -0,0 +1,141 @@
+# services/retrieval_gate.py
+from typing import Any, Dict, List, Optional
+import re
+from utils.tokens import tokenize
+
+# Messages that are pure conversation glue never need fresh sources
+SMALL_TALK = re.compile(
+    r"^(hi|hello|hey|thanks|thank you|thx|ty|ok|okay|cool|great|nice|perfect|awesome|"
+    r"got it|sounds good|bye|goodbye|see you|good (morning|afternoon|evening|night)|yes|no|sure)"
+    r"[\s!.,:)]*$"
+)
+
+# Questions about the conversation or the user's own profile are answered
+# from the prompt, not from the web
+SELF_REFERENCE = re.compile(
+    r"\b(you (said|mentioned|recommended|suggested)|remind me|"
+    r"what did (you|i)( (say|mention|recommend|suggest|ask))?|summari[sz]e)\b|"
+    r"^(what('s| is| was)|tell me) my (skin type|hair (type|texture)|face shape|profile|age|name|budget)\b"
+)
+
+# Terms that point at facts the model should look up: shopping and
+# evidence words, ingredients and product types, and common skin and hair
+# concerns
+RETRIEVAL_TERMS = {
+    "best", "recommend", "recommendation", "recommendations", "suggest", "product", "products",
+    "brand", "brands", "price", "prices", "cost", "cheap", "affordable", "buy", "where",
+    "review", "reviews", "rated", "vs", "versus", "compare", "comparison", "alternative",
+    "alternatives", "dupe", "dupes", "ingredient", "ingredients", "contain", "contains",
+    "safe", "safety", "side", "effects", "pregnancy", "pregnant", "study", "studies", "research",
+    "evidence", "dermatologist", "latest", "new", "trend", "trending", "2024", "2025",
+    "treat", "treatment", "cure", "remedy", "remedies", "prevent", "reduce", "rid", "tips",
+    "routine", "allergy", "allergic",
+    "spf", "retinol", "retinoid", "niacinamide", "acid", "hyaluronic", "salicylic", "glycolic",
+    "vitamin", "ceramide", "ceramides", "peptide", "peptides", "benzoyl", "peroxide",
+    "serum", "sunscreen", "cleanser", "moisturizer", "toner", "exfoliator", "mask",
+    "foundation", "concealer", "primer", "lipstick", "makeup", "shampoo", "conditioner",
+    "acne", "pimple", "pimples", "breakout", "breakouts", "blackheads", "whiteheads", "pores",
+    "oily", "dry", "dehydrated", "sensitive", "redness", "rosacea", "eczema", "pigmentation",
+    "hyperpigmentation", "melasma", "spots", "dark", "circles", "puffiness", "wrinkles",
+    "aging", "dullness", "tan", "sunburn", "scars", "texture",
+    "dandruff", "frizz", "frizzy", "hairfall", "thinning", "breakage", "scalp", "split", "grey",
+    "gray"
+}
+
+QUESTION_WORDS = {"what", "which", "how", "why", "when", "where", "who", "should", "can", "does", "is", "are"}
+
+# Every message that isn't conversation glue starts here, so with the default
+# threshold it is retrieved for; a higher threshold demands lookup evidence
+BASE_SCORE = 0.5
+# Score from which a message counts as a standalone lookup question
+LOOKUP_SCORE = 1.5
+
+# Follow-ups like "and for oily skin?" inherit part of the previous question's need
+FOLLOW_UP = re.compile(r"^(and|what about|how about|also|or)\b|\b(it|that|those|them|this one)\b")
+
+class RetrievalGate:
+    """Cheap local check whether a chat message needs web retrieval.
+
+    Scores the user message with keyword heuristics: small talk and
+    questions about the conversation or the user's own profile score zero,
+    anything else starts at BASE_SCORE, lookup terms and question form
+    raise the score, and short follow-ups borrow from the previous user
+    message. Retrieval runs when the score reaches `threshold`, so at the
+    default only clearly conversational messages skip it.
+
+    Every decision is counted, and the average latency of the retrievals
+    that did run is used to estimate the time saved by the skipped ones.
+    """
+
+    def __init__(self, threshold: float = BASE_SCORE, enabled: bool = True):
+        self.threshold = threshold
+        self.enabled = enabled
+        self.retrieved = 0
+        self.skipped = 0
+        self.retrieval_ms_total = 0.0
+
+    def score(self, message: str, previous_message: Optional[str] = None) -> float:
+        text = message.strip().lower()
+        if not text or SMALL_TALK.match(text):
+            return 0.0
+
+        tokens = tokenize(text)
+        # "What did you recommend?" is answered from the conversation, but
+        # "you recommended retinol, is it safe?" still needs a lookup
+        self_reference = SELF_REFERENCE.search(text)
+        rest = text[:self_reference.start()] + text[self_reference.end():] if self_reference else text
+        terms = sum(1 for token in tokenize(rest) if token in RETRIEVAL_TERMS)
+        if self_reference and terms == 0:
+            return 0.0
+        score = BASE_SCORE + 0.5 * terms
+        if "?" in text or (tokens and tokens[0] in QUESTION_WORDS):
+            score += 0.5
+        if len(tokens) >= 12:
+            score += 0.25
+
+        if previous_message and len(tokens) <= 8 and self.is_follow_up(text):
+            score += 0.5 * self.score(previous_message)
+        return score
+
+    def is_lookup(self, message: str) -> bool:
+        """Whether the message is a standalone question about products or facts"""
+        return not self.is_follow_up(message) and self.score(message) >= LOOKUP_SCORE
+
+    def is_follow_up(self, message: str) -> bool:
+        """Whether the message only makes sense together with earlier turns"""
+        return bool(FOLLOW_UP.search(message.strip().lower()))
+
+    def decide(self, message: str, history: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Decide for the latest user message; `history` holds earlier user messages"""
+        previous_message = history[-1] if history else None
+        score = self.score(message, previous_message)
+        needs_retrieval = not self.enabled or score >= self.threshold
+        if needs_retrieval:
+            self.retrieved += 1
+        else:
+            self.skipped += 1
+        return {
+            "needs_retrieval": needs_retrieval,
+            "score": round(score, 2),
+            "threshold": self.threshold,
+            "estimated_saved_ms": 0.0 if needs_retrieval else round(self.avg_retrieval_ms, 1)
+        }
+
+    def record_retrieval(self, elapsed_ms: float):
+        """Report how long a retrieval took, to estimate savings of skipped ones"""
+        self.retrieval_ms_total += elapsed_ms
+
+    @property
+    def avg_retrieval_ms(self) -> float:
+        return self.retrieval_ms_total / self.retrieved if self.retrieved else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        decisions = self.retrieved + self.skipped
+        return {
+            "decisions": decisions,
+            "retrieved": self.retrieved,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skipped / decisions, 4) if decisions else 0.0,
+            "avg_retrieval_ms": round(self.avg_retrieval_ms, 1),
+            "estimated_saved_ms": round(self.skipped * self.avg_retrieval_ms, 1)
+        }
@@ -1,10 +1,37 @@
 # services/search_api.py
 from typing import List, Dict, Optional
-import aiohttp
-import trafilatura
 import asyncio
-from urllib.parse import quote_plus
-from core.config import BRAVE_SEARCH_API_KEY
+import time
+from urllib.parse import quote_plus, urlparse
+from core.config import (
+    BRAVE_SEARCH_API_KEY,
+    SOURCE_FETCH_CONCURRENCY,
+    SOURCE_FETCH_DEADLINE,
+    SEARCH_CACHE_TTL,
+    SEARCH_CACHE_STALE_TTL,
+    SEARCH_CACHE_MAX_ENTRIES,
+    CONTENT_CACHE_PATH,
+    CONTENT_CACHE_MAX_BYTES,
+    CONTENT_CACHE_TTL
+)
+from services.http_client import get_http_session
+from services.cache import AsyncTTLCache
+from services.content_cache import ContentCache
+from services.extraction import extraction_engine
+
+# Shared by every SourceExtractorService instance in the process
+search_cache = AsyncTTLCache(
+    maxsize=SEARCH_CACHE_MAX_ENTRIES,
+    ttl=SEARCH_CACHE_TTL,
+    stale_ttl=SEARCH_CACHE_STALE_TTL,
+    name="brave_search"
+)
+
+content_cache = ContentCache(
+    path=CONTENT_CACHE_PATH,
+    max_bytes=CONTENT_CACHE_MAX_BYTES,
+    ttl=CONTENT_CACHE_TTL
+)
 
 class SourceExtractorService:
     def __init__(self):
@@ -16,8 +43,22 @@ class SourceExtractorService:
         }
         self.brave_search_url = "https://api.search.brave.com/res/v1/web/search"
         
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize a query so trivially different spellings share a cache entry"""
+        return " ".join(query.lower().split())
+
     async def search(self, query: str, country: str = "in", count: int = 5) -> Dict:
-        """Perform Brave search and return results"""
+        """Perform Brave search and return results, served from cache when possible"""
+        key = (self.normalize_query(query), country.lower(), count)
+        return await search_cache.get_or_load(
+            key,
+            # Fetch with the normalized values the entry is keyed on
+            lambda: self._search_brave(key[0], key[1], count)
+        )
+
+    async def _search_brave(self, query: str, country: str, count: int) -> Dict:
+        """Call the Brave search API"""
         params = {
             "q": quote_plus(query),
             "country": country,
@@ -25,27 +66,62 @@ class SourceExtractorService:
             "count": count
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                self.brave_search_url,
-                headers=self.headers,
-                params=params
-            ) as response:
-                return await response.json()
+        session = get_http_session()
+        async with session.get(
+            self.brave_search_url,
+            headers=self.headers,
+            params=params
+        ) as response:
+            # Raise on errors so failed responses are never cached
+            response.raise_for_status()
+            return await response.json()
+
+    async def fetch_page(self, url: str) -> Dict:
+        """Fetch a URL, consulting the content cache first.
+
+        Returns {"content": ...} when the cache can answer (fresh entry or a
+        304 on revalidation), otherwise {"html": ...} plus the response
+        validators so the extracted text can be cached afterwards.
+        """
+        cached = await content_cache.get(url)
+        if cached and content_cache.is_fresh(cached):
+            return {"content": cached["content"]}
+
+        headers = {}
+        if cached and cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        session = get_http_session()
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and cached:
+                await content_cache.touch(url)
+                return {"content": cached["content"]}
+            return {
+                "html": await response.text(),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "cacheable": response.status == 200
+            }
+
+    async def _store_extracted(self, url: str, page: Dict, content: Optional[str]):
+        if content and page.get("cacheable"):
+            await content_cache.put(url, content, page["etag"], page["last_modified"])
 
     async def extract_content(self, url: str) -> Optional[str]:
-        """Extract main content from a URL using Trafilatura"""
+        """Extract main content from a URL using Trafilatura.
+
+        Fresh cache entries are returned without touching the network. Stale
+        entries are revalidated with a conditional GET and reused on a 304.
+        """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    html = await response.text()
-                    return await asyncio.to_thread(
-                        trafilatura.extract,
-                        html,
-                        include_links=False,
-                        include_images=False,
-                        include_tables=False
-                    )
+            page = await self.fetch_page(url)
+            if "content" in page:
+                return page["content"]
+            content = await extraction_engine.extract(page["html"])
+            await self._store_extracted(url, page, content)
+            return content
         except Exception as e:
             print(f"Error extracting content from {url}: {str(e)}")
             return None
@@ -54,28 +130,94 @@ class SourceExtractorService:
       """Get sources from Brave search"""
       pass
 
-    async def get_source_context(self, query: str) -> List[Dict]:
-        """Get context from multiple sources for a query"""
+    async def _fetch_with_timing(self, url: str, semaphore: asyncio.Semaphore) -> Dict:
+        """Fetch a single search result, recording how long it took"""
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                page = await self.fetch_page(url)
+            except Exception as e:
+                print(f"Error fetching {url}: {str(e)}")
+                page = {}
+            page["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        source = "cache" if "content" in page else "network"
+        print(f"Source {urlparse(url).netloc} fetched from {source} in {page['elapsed_ms']:.0f}ms")
+        return page
+
+    async def get_source_context(
+        self,
+        query: str,
+        concurrency: int = SOURCE_FETCH_CONCURRENCY,
+        deadline: float = SOURCE_FETCH_DEADLINE
+    ) -> List[Dict]:
+        """Get context from multiple sources for a query.
+
+        All result URLs are fetched concurrently (at most `concurrency` at a
+        time) and the uncached pages are extracted as one batch on the
+        extraction pool. Once `deadline` seconds have passed, whatever
+        sources have finished are returned and the stragglers are dropped.
+        """
         try:
+            loop = asyncio.get_running_loop()
+            deadline_at = loop.time() + deadline
+
             # Get search results
             search_results = await self.search(query)
+            results = [
+                result for result in search_results.get("web", {}).get("results", [])
+                if result.get("url")
+            ]
+            if not results:
+                return []
+
+            semaphore = asyncio.Semaphore(concurrency)
+            tasks = [
+                asyncio.create_task(self._fetch_with_timing(result["url"], semaphore))
+                for result in results
+            ]
+            done, pending = await asyncio.wait(tasks, timeout=max(deadline_at - loop.time(), 0))
+
+            if pending:
+                for task in pending:
+                    task.cancel()
+                skipped = [
+                    urlparse(result["url"]).netloc
+                    for task, result in zip(tasks, results) if task in pending
+                ]
+                print(f"Source deadline of {deadline}s reached, skipped: {', '.join(skipped)}")
+
+            pages = [task.result() if task in done else {} for task in tasks]
+
+            # Extract every freshly fetched page in one batch
+            to_extract = [idx for idx, page in enumerate(pages) if "html" in page]
+            if to_extract:
+                remaining = deadline_at - loop.time()
+                started = time.perf_counter()
+                extracted = await extraction_engine.extract_many(
+                    [pages[idx]["html"] for idx in to_extract],
+                    deadline=max(remaining, 0.1)
+                )
+                print(f"Extracted {len(to_extract)} page(s) in {(time.perf_counter() - started) * 1000:.0f}ms")
+                for idx, content in zip(to_extract, extracted):
+                    pages[idx]["content"] = content
+                await asyncio.gather(*[
+                    self._store_extracted(results[idx]["url"], pages[idx], pages[idx]["content"])
+                    for idx in to_extract
+                ])
+
+            # Keep the search engine's ranking order
             sources = []
-            
-            # Extract content from each result
-            for result in search_results.get("web", {}).get("results", []):
-                url = result.get("url")
-                if not url:
+            for result, page in zip(results, pages):
+                if not page.get("content"):
                     continue
-                    
-                content = await self.extract_content(url)
-                if content:
-                    sources.append({
-                        "url": url,
-                        "title": result.get("title", ""),
-                        "description": result.get("description", ""),
-                        "content": content
-                    })
-            
+                sources.append({
+                    "url": result["url"],
+                    "title": result.get("title", ""),
+                    "description": result.get("description", ""),
+                    "content": page["content"],
+                    "elapsed_ms": page["elapsed_ms"]
+                })
             return sources
         except Exception as e:
             print(f"Error getting source context: {str(e)}")
@@ -0,0 +1,421 @@
+# services/session_store.py
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+import time
+import uuid
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    FieldCondition,
+    Filter,
+    MatchValue,
+    OrderBy,
+    PayloadSchemaType,
+    PointStruct,
+    PointVectors,
+    Record
+)
+from services.qdrant import ensure_collection, get_async_qdrant_client
+from core.config import SESSION_STORE_BACKEND
+
+SCHEMA_VERSION = 2
+
+class SessionStore(ABC):
+    """Where chat sessions and their message history live.
+
+    Every worker process reads and writes conversation state through this
+    interface, so with a shared backend any worker can serve any turn.
+    Sessions are returned as records with `id` and `payload` (profile,
+    profile_hash, summary, summarized_count and `last_seq`, the seq of the
+    newest message). `last_seq` lets per-process history caches notice that
+    another worker has added turns since they loaded the session.
+    """
+
+    async def init(self):
+        """Create whatever storage the backend needs"""
+
+    @abstractmethod
+    async def create_session(
+        self,
+        session_id: str,
+        profile: Dict[str, Any],
+        profile_hash: str,
+        vector: List[float]
+    ):
+        ...
+
+    @abstractmethod
+    async def get_session(self, session_id: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def session_exists(self, session_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def update_profile(
+        self,
+        session_id: str,
+        profile: Dict[str, Any],
+        profile_hash: str,
+        vector: List[float]
+    ):
+        ...
+
+    @abstractmethod
+    async def set_summary(self, session_id: str, summary: str, summarized_count: int):
+        ...
+
+    @abstractmethod
+    async def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> int:
+        """Append messages to the history, returning the new `last_seq`"""
+
+    @abstractmethod
+    async def get_messages(self, session_id: str) -> List[Dict[str, Any]]:
+        """The full history, oldest first, each message carrying its `seq`"""
+
+    @abstractmethod
+    async def get_messages_page(
+        self,
+        session_id: str,
+        limit: int,
+        before: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Up to `limit` messages older than the `before` cursor, newest first"""
+
+class SessionRecord:
+    """A session as returned by InMemorySessionStore, shaped like a Qdrant Record"""
+
+    def __init__(self, id: str, payload: Dict[str, Any]):
+        self.id = id
+        self.payload = payload
+
+class InMemorySessionStore(SessionStore):
+    """Process-local sessions for development and tests.
+
+    Nothing is persisted and nothing is shared between processes, so this
+    backend only works with a single worker.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._messages: Dict[str, List[Dict[str, Any]]] = {}
+
+    async def create_session(
+        self,
+        session_id: str,
+        profile: Dict[str, Any],
+        profile_hash: str,
+        vector: List[float]
+    ):
+        self._sessions[session_id] = {
+            'profile': profile,
+            'profile_hash': profile_hash,
+            'schema_version': SCHEMA_VERSION
+        }
+        self._messages[session_id] = []
+
+    async def get_session(self, session_id: str) -> Optional[SessionRecord]:
+        payload = self._sessions.get(session_id)
+        if payload is None:
+            return None
+        # A copy, like a record fetched from a remote store
+        return SessionRecord(session_id, dict(payload))
+
+    async def session_exists(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    async def update_profile(
+        self,
+        session_id: str,
+        profile: Dict[str, Any],
+        profile_hash: str,
+        vector: List[float]
+    ):
+        self._sessions[session_id].update({'profile': profile, 'profile_hash': profile_hash})
+
+    async def set_summary(self, session_id: str, summary: str, summarized_count: int):
+        self._sessions[session_id].update({'summary': summary, 'summarized_count': summarized_count})
+
+    async def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> int:
+        base_seq = time.time_ns()
+        history = self._messages.setdefault(session_id, [])
+        for offset, message in enumerate(messages):
+            history.append({**message, 'seq': base_seq + offset})
+        last_seq = base_seq + len(messages) - 1
+        self._sessions[session_id]['last_seq'] = last_seq
+        return last_seq
+
+    async def get_messages(self, session_id: str) -> List[Dict[str, Any]]:
+        return list(self._messages.get(session_id, []))
+
+    async def get_messages_page(
+        self,
+        session_id: str,
+        limit: int,
+        before: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        older = [
+            message for message in self._messages.get(session_id, [])
+            if before is None or message['seq'] < before
+        ]
+        page = older[::-1][:limit]
+        next_cursor = page[-1]['seq'] if len(older) > limit else None
+        return page, next_cursor
+
+class QdrantSessionStore(SessionStore):
+    """Chat session storage on Qdrant with append-only message history.
+
+    Each session is one point in `sessions_collection` holding the profile
+    vector and a small payload (profile, profile_hash, schema_version and
+    the running conversation summary).
+    Every chat message is its own vector-less point in `messages_collection`
+    keyed by session_id and an increasing `seq`, so a new turn is a
+    constant-size insert no matter how long the conversation is.
+
+    Sessions written by the old layout (a growing `messages` list on the
+    session point) are migrated on first read, or in bulk with
+    scripts/migrate_sessions.py.
+    """
+
+    def __init__(
+        self,
+        client: AsyncQdrantClient,
+        sessions_collection: str = "beauty_consultations",
+        messages_collection: str = "beauty_consultation_messages"
+    ):
+        self.client = client
+        self.sessions_collection = sessions_collection
+        self.messages_collection = messages_collection
+
+    async def init(self):
+        """Create the message collection and its payload indexes if missing"""
+        if await ensure_collection(self.client, self.messages_collection, vectors_config={}):
+            print(f"Collection {self.messages_collection} successfully initialized")
+        await self.client.create_payload_index(
+            collection_name=self.messages_collection,
+            field_name="session_id",
+            field_schema=PayloadSchemaType.KEYWORD
+        )
+        await self.client.create_payload_index(
+            collection_name=self.messages_collection,
+            field_name="seq",
+            field_schema=PayloadSchemaType.INTEGER
+        )
+
+    async def create_session(
+        self,
+        session_id: str,
+        profile: Dict[str, Any],
+        profile_hash: str,
+        vector: List[float]
+    ):
+        await self.client.upsert(
+            collection_name=self.sessions_collection,
+            points=[PointStruct(
+                id=session_id,
+                vector=vector,
+                payload={
+                    'profile': profile,
+                    'profile_hash': profile_hash,
+                    'schema_version': SCHEMA_VERSION
+                }
+            )]
+        )
+
+    async def get_session(self, session_id: str) -> Optional[Record]:
+        """Return the session point (payload only), migrating legacy sessions"""
+        points = await self.client.retrieve(
+            collection_name=self.sessions_collection,
+            ids=[session_id],
+            with_vectors=False
+        )
+        if not points:
+            return None
+        session = points[0]
+        if 'messages' in session.payload:
+            await self.migrate_session(session)
+        return session
+
+    async def session_exists(self, session_id: str) -> bool:
+        """Cheap existence check that also migrates legacy sessions on first touch"""
+        points = await self.client.retrieve(
+            collection_name=self.sessions_collection,
+            ids=[session_id],
+            with_payload=['schema_version'],
+            with_vectors=False
+        )
+        if not points:
+            return False
+        if points[0].payload.get('schema_version') != SCHEMA_VERSION:
+            await self.get_session(session_id)
+        return True
+
+    async def update_profile(
+        self,
+        session_id: str,
+        profile: Dict[str, Any],
+        profile_hash: str,
+        vector: List[float]
+    ):
+        """Rewrite the profile and its vector; only called when the profile changed"""
+        await self.client.update_vectors(
+            collection_name=self.sessions_collection,
+            points=[PointVectors(id=session_id, vector=vector)]
+        )
+        await self.client.set_payload(
+            collection_name=self.sessions_collection,
+            payload={'profile': profile, 'profile_hash': profile_hash},
+            points=[session_id]
+        )
+
+    async def set_summary(self, session_id: str, summary: str, summarized_count: int):
+        """Store the running conversation summary and how many messages it covers"""
+        await self.client.set_payload(
+            collection_name=self.sessions_collection,
+            payload={'summary': summary, 'summarized_count': summarized_count},
+            points=[session_id]
+        )
+
+    def _message_point(self, session_id: str, seq: int, message: Dict[str, Any]) -> PointStruct:
+        # Deterministic ids make re-running a partial migration idempotent
+        return PointStruct(
+            id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"{session_id}/{seq}")),
+            vector={},
+            payload={
+                'session_id': session_id,
+                'seq': seq,
+                'role': message['role'],
+                'content': message['content'],
+                'timestamp': message.get('timestamp')
+            }
+        )
+
+    async def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> int:
+        """Append messages to a session's history, returning the new last seq.
+
+        Sequence numbers come from the wall clock in nanoseconds, so appends
+        never need to read the current history length first. The last seq
+        is recorded on the session point for other workers' caches.
+        """
+        base_seq = time.time_ns()
+        await self.client.upsert(
+            collection_name=self.messages_collection,
+            points=[
+                self._message_point(session_id, base_seq + offset, message)
+                for offset, message in enumerate(messages)
+            ]
+        )
+        last_seq = base_seq + len(messages) - 1
+        await self.client.set_payload(
+            collection_name=self.sessions_collection,
+            payload={'last_seq': last_seq},
+            points=[session_id]
+        )
+        return last_seq
+
+    async def get_messages(self, session_id: str, page_size: int = 256) -> List[Dict[str, Any]]:
+        """Return the full message history of a session, oldest first"""
+        messages: List[Dict[str, Any]] = []
+        start_from = None
+        while True:
+            points, _ = await self.client.scroll(
+                collection_name=self.messages_collection,
+                scroll_filter=Filter(must=[
+                    FieldCondition(key='session_id', match=MatchValue(value=session_id))
+                ]),
+                order_by=OrderBy(key='seq', direction='asc', start_from=start_from),
+                limit=page_size,
+                with_payload=['role', 'content', 'timestamp', 'seq'],
+                with_vectors=False
+            )
+            messages.extend(point.payload for point in points)
+            if len(points) < page_size:
+                return messages
+            start_from = points[-1].payload['seq'] + 1
+
+    async def get_messages_page(
+        self,
+        session_id: str,
+        limit: int,
+        before: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Return up to `limit` messages older than the `before` cursor, newest first.
+
+        Only the message fields are transferred (no vectors, no session
+        payload). The returned cursor is the seq of the oldest message in the
+        page, or None when there is nothing older.
+        """
+        points, _ = await self.client.scroll(
+            collection_name=self.messages_collection,
+            scroll_filter=Filter(must=[
+                FieldCondition(key='session_id', match=MatchValue(value=session_id))
+            ]),
+            order_by=OrderBy(
+                key='seq',
+                direction='desc',
+                start_from=before - 1 if before is not None else None
+            ),
+            limit=limit + 1,
+            with_payload=['role', 'content', 'timestamp', 'seq'],
+            with_vectors=False
+        )
+        page = [point.payload for point in points[:limit]]
+        next_cursor = page[-1]['seq'] if len(points) > limit else None
+        return page, next_cursor
+
+    async def migrate_session(self, session: Record):
+        """Move a legacy embedded `messages` list into per-message points"""
+        legacy_messages = session.payload.pop('messages', [])
+        if legacy_messages:
+            # Small sequence numbers keep legacy messages ahead of new turns
+            await self.client.upsert(
+                collection_name=self.messages_collection,
+                points=[
+                    self._message_point(str(session.id), seq, message)
+                    for seq, message in enumerate(legacy_messages)
+                ]
+            )
+        await self.client.delete_payload(
+            collection_name=self.sessions_collection,
+            keys=['messages'],
+            points=[session.id]
+        )
+        await self.client.set_payload(
+            collection_name=self.sessions_collection,
+            payload={'schema_version': SCHEMA_VERSION},
+            points=[session.id]
+        )
+        session.payload['schema_version'] = SCHEMA_VERSION
+
+    async def migrate_all(self, batch_size: int = 100) -> int:
+        """Migrate every legacy session in the collection, returns the count"""
+        migrated = 0
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=self.sessions_collection,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
+            for point in points:
+                if 'messages' in point.payload:
+                    await self.migrate_session(point)
+                    migrated += 1
+            if offset is None:
+                return migrated
+
+_store: Optional[SessionStore] = None
+
+def get_session_store() -> SessionStore:
+    """The process-wide session store for the configured SESSION_STORE_BACKEND"""
+    global _store
+    if _store is None:
+        if SESSION_STORE_BACKEND == "memory":
+            _store = InMemorySessionStore()
+        elif SESSION_STORE_BACKEND == "qdrant":
+            _store = QdrantSessionStore(get_async_qdrant_client())
+        else:
+            raise ValueError(f"Unknown SESSION_STORE_BACKEND {SESSION_STORE_BACKEND!r}")
+    return _store
@@ -0,0 +1,148 @@
+# services/streaming.py
+from typing import Any, Dict, Iterator, List, Optional
+import json
+import re
+import time
+import uuid
+from core.config import STREAM_FLUSH_POLICY, STREAM_FLUSH_INTERVAL_MS, STREAM_MAX_BUFFER_CHARS
+
+FLUSH_POLICIES = ("token", "time", "sentence")
+SENTENCE_ENDINGS = ".!?\n"
+_REPLAY_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+class SSEStreamEncoder:
+    """Encode one streamed LLM response as JSON server-sent events.
+
+    Tokens are appended to an incremental buffer and emitted according to
+    the flush policy:
+    - "token": every token is sent as soon as it arrives
+    - "time": buffered tokens are sent every `flush_interval_ms`
+    - "sentence": sent at the end of a sentence
+    Both buffered policies also flush once `max_buffer_chars` are pending.
+    All events of a response share one message id, and the time to the
+    first token is measured from when the encoder was created.
+    """
+
+    def __init__(
+        self,
+        flush_policy: str = "sentence",
+        flush_interval_ms: float = 50,
+        max_buffer_chars: int = 150
+    ):
+        if flush_policy not in FLUSH_POLICIES:
+            raise ValueError(f"Unknown flush policy: {flush_policy}")
+        self.flush_policy = flush_policy
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_buffer_chars = max_buffer_chars
+        self.message_id = f"message-{uuid.uuid4()}"
+        self.started_at = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self._last_flush = self.started_at
+        self._buffer: List[str] = []
+        self._buffer_chars = 0
+        self._response: List[str] = []
+        self.failed = False
+
+    def event(self, event: str, data: Any) -> str:
+        """Format an SSE message; start/done/error are control events"""
+        if event in ("start", "done", "error"):
+            payload: Dict[str, Any] = {
+                "event": event.upper(),
+                "message_id": self.message_id,
+                "content": data
+            }
+            if event == "done":
+                payload["metrics"] = self.metrics()
+        else:
+            payload = {
+                "message_id": self.message_id,
+                "type": "message",
+                "content": data
+            }
+        return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    def start(self, content: str) -> str:
+        return self.event("start", content)
+
+    def done(self, content: str = "Response completed") -> str:
+        return self.event("done", content)
+
+    def error(self, content: str) -> str:
+        self.failed = True
+        return self.event("error", content)
+
+    def push(self, token: str) -> Optional[str]:
+        """Add a token; returns an SSE chunk when the flush policy says so"""
+        if not token:
+            return None
+        now = time.perf_counter()
+        if self.first_token_at is None:
+            self.first_token_at = now
+        self._buffer.append(token)
+        self._buffer_chars += len(token)
+        self._response.append(token)
+
+        if self.flush_policy == "token":
+            return self.flush()
+        if self._buffer_chars >= self.max_buffer_chars:
+            return self.flush()
+        if self.flush_policy == "time" and now - self._last_flush >= self.flush_interval:
+            return self.flush()
+        if self.flush_policy == "sentence":
+            # A whitespace-only token is not the end of a sentence
+            tail = token.rstrip(" ")
+            if tail and tail[-1] in SENTENCE_ENDINGS:
+                return self.flush()
+        return None
+
+    def flush(self) -> Optional[str]:
+        """Emit whatever is buffered"""
+        self._last_flush = time.perf_counter()
+        if not self._buffer:
+            return None
+        text = "".join(self._buffer)
+        self._buffer = []
+        self._buffer_chars = 0
+        return self.event("chunk", text)
+
+    def final(self) -> str:
+        """The complete response as one event, sent after the last chunk"""
+        return self.event("final", self.text)
+
+    def replay(self, text: str, start: str, done: str = "Response completed") -> Iterator[str]:
+        """Stream an already complete response word by word through the flush policy"""
+        yield self.start(start)
+        for token in _REPLAY_TOKEN_RE.findall(text):
+            sse_chunk = self.push(token)
+            if sse_chunk:
+                yield sse_chunk
+        remaining = self.flush()
+        if remaining:
+            yield remaining
+        yield self.final()
+        yield self.done(done)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._response)
+
+    @property
+    def ttft_ms(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return round((self.first_token_at - self.started_at) * 1000, 1)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "ttft_ms": self.ttft_ms,
+            "total_ms": round((time.perf_counter() - self.started_at) * 1000, 1),
+            "chars": sum(len(token) for token in self._response)
+        }
+
+def create_stream_encoder() -> SSEStreamEncoder:
+    """Encoder configured from the STREAM_* settings"""
+    return SSEStreamEncoder(
+        flush_policy=STREAM_FLUSH_POLICY,
+        flush_interval_ms=STREAM_FLUSH_INTERVAL_MS,
+        max_buffer_chars=STREAM_MAX_BUFFER_CHARS
+    )
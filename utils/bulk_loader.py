@@ -0,0 +1,324 @@
+# utils/bulk_loader.py
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple
+import io
+import json
+import time
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from services.migrations import MIGRATION_LOCK_ID, advisory_lock
+from utils.data_loader import extract_brand, extract_price_value
+from core.config import BULK_LOAD_BATCH_SIZE
+
+COLUMNS = ("product_name", "brand", "price", "price_value", "rating", "description", "link")
+# Lengths of the varchar columns; longer values would abort a whole COPY
+MAX_LENGTHS = {"product_name": 255, "brand": 100, "price": 50, "link": 512}
+READ_CHUNK_CHARS = 64 * 1024
+# A decode error this close to the end of the buffer may just be an item
+# cut off mid-token ("tru" of true), so more input is read before giving up
+DECODE_LOOKAHEAD_CHARS = 16
+MAX_REPORTED_ERRORS = 20
+
+STAGING_DDL = """
+    CREATE TEMP TABLE IF NOT EXISTS products_staging (
+        seq BIGINT,
+        product_name VARCHAR(255),
+        brand VARCHAR(100),
+        price VARCHAR(50),
+        price_value DOUBLE PRECISION,
+        rating DOUBLE PRECISION,
+        description TEXT,
+        link VARCHAR(512)
+    ) ON COMMIT DELETE ROWS
+"""
+
+# The latest occurrence of a link in the batch wins; rows whose data did
+# not change are left alone so they cost no write (and no re-indexing)
+UPSERT_SQL = """
+    INSERT INTO products (product_name, brand, price, price_value, rating, description, link)
+    SELECT DISTINCT ON (link) product_name, brand, price, price_value, rating, description, link
+    FROM products_staging
+    ORDER BY link, seq DESC
+    ON CONFLICT (link) DO UPDATE SET
+        product_name = EXCLUDED.product_name,
+        brand = EXCLUDED.brand,
+        price = EXCLUDED.price,
+        price_value = EXCLUDED.price_value,
+        rating = EXCLUDED.rating,
+        description = EXCLUDED.description
+    WHERE (products.product_name, products.brand, products.price,
+           products.price_value, products.rating, products.description)
+        IS DISTINCT FROM (EXCLUDED.product_name, EXCLUDED.brand, EXCLUDED.price,
+                          EXCLUDED.price_value, EXCLUDED.rating, EXCLUDED.description)
+    RETURNING id, (xmax = 0) AS inserted
+"""
+
+def _is_truncated(error: json.JSONDecodeError, buffer: str) -> bool:
+    """Whether reading more input could make the failed item decode"""
+    return (
+        error.msg.startswith("Unterminated string")
+        or error.pos + DECODE_LOOKAHEAD_CHARS >= len(buffer)
+    )
+
+def _next_record(
+    decoder: json.JSONDecoder,
+    buffer: str,
+    start: int,
+    search_from: int,
+    in_array: bool,
+    eof: bool
+) -> Tuple[Optional[int], int]:
+    """Where the record after the malformed one at `start` begins.
+
+    Returns the index (None until the buffer holds it) and the position to
+    resume searching from once more input has been read. NDJSON records end
+    at the line; in an array the next record is the first "{" after a comma
+    that decodes on its own, which assumes flat records.
+    """
+    if not in_array:
+        newline = buffer.find("\n", start)
+        return (newline + 1 if newline >= 0 else None), start
+    candidate = buffer.find("{", search_from)
+    while candidate >= 0:
+        before = candidate - 1
+        while before > start and buffer[before] in " \t\r\n":
+            before -= 1
+        if buffer[before] == ",":
+            try:
+                decoder.raw_decode(buffer, candidate)
+                return candidate, candidate
+            except json.JSONDecodeError as e:
+                if not eof and _is_truncated(e, buffer):
+                    return None, candidate
+        candidate = buffer.find("{", candidate + 1)
+    return None, len(buffer)
+
+def iter_json_records(
+    f: IO[str],
+    chunk_chars: int = READ_CHUNK_CHARS,
+    on_error: Optional[Callable[[json.JSONDecodeError], None]] = None
+) -> Iterator[Any]:
+    """Yield the items of a JSON array, or the lines of an NDJSON file, one at a time.
+
+    Only the current read chunk and the item being decoded are held in
+    memory, however large the file is. A malformed item raises, unless
+    `on_error` is given: it then receives the error and reading resumes at
+    the next record.
+
+    >>> errors = []
+    >>> list(iter_json_records(io.StringIO('[{"a": 1}, {"a": tru}, {"a": 3}]'), on_error=errors.append))
+    [{'a': 1}, {'a': 3}]
+    >>> len(errors)
+    1
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    in_array: Optional[bool] = None
+
+    while True:
+        # Skip whitespace and item separators, reading more input as needed
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            chunk = f.read(chunk_chars)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+        if pos >= len(buffer):
+            return
+
+        if in_array is None:
+            in_array = buffer[pos] == "["
+            if in_array:
+                pos += 1
+                continue
+        if in_array and buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if not eof and _is_truncated(e, buffer):
+                # The item continues in the next chunk
+                chunk = f.read(chunk_chars)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            if on_error is None:
+                raise
+            on_error(e)
+            # Read only as far as the start of the next record
+            search_from = pos + 1
+            while True:
+                resume, search_from = _next_record(decoder, buffer, pos, search_from, in_array, eof)
+                if resume is not None or eof:
+                    break
+                chunk = f.read(chunk_chars)
+                eof = not chunk
+                buffer, pos, search_from = buffer[pos:] + chunk, 0, search_from - pos
+            if resume is None:
+                return
+            pos = resume
+            continue
+        yield item
+        pos = end
+        if pos >= chunk_chars:
+            buffer, pos = buffer[pos:], 0
+
+def to_row(item: Dict[str, Any]) -> Tuple:
+    """Validate and convert one catalog item to a staging row"""
+    price = str(item["price"])
+    rating = item.get("rating")
+    row = {
+        "product_name": item["product_name"],
+        "brand": extract_brand(item["product_name"]),
+        "price": price,
+        "price_value": extract_price_value(price),
+        "rating": float(rating) if rating not in (None, "") else None,
+        "description": item.get("description"),
+        "link": item["link"]
+    }
+    if not row["link"]:
+        raise ValueError("missing link")
+    for column, max_length in MAX_LENGTHS.items():
+        if row[column] is not None and len(row[column]) > max_length:
+            raise ValueError(f"{column} longer than {max_length} characters")
+    return tuple(row[column] for column in COLUMNS)
+
+def copy_field(value: Any) -> str:
+    r"""Encode one value for COPY ... WITH (FORMAT csv, NULL '\N').
+
+    None becomes the bare NULL marker; text is always quoted, so a text
+    value that happens to read \N, and empty strings, stay text.
+
+    >>> ",".join(copy_field(v) for v in (1, 'a"b', 100.0, None, "", "\\N"))
+    '1,"a""b",100.0,\\N,"","\\N"'
+    >>> item = {"product_name": "X", "price": "₹100", "rating": None, "description": None, "link": "l"}
+    >>> ",".join(copy_field(v) for v in to_row(item))
+    '"X","X","₹100",100.0,\\N,\\N,"l"'
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return repr(value)
+
+def _copy_batch(cursor, batch: List[Tuple], first_seq: int) -> Tuple[List[int], int]:
+    """COPY one batch into staging and upsert it; returns (changed ids, inserted)"""
+    # csv.writer can't tell None from "" (both come out as ""), which would
+    # turn a missing rating into a parse error and NULL descriptions into
+    # empty strings, so each line is encoded by hand
+    buffer = io.StringIO()
+    for seq, row in enumerate(batch, start=first_seq):
+        buffer.write(",".join(copy_field(value) for value in (seq,) + row))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY products_staging (seq, {', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+        buffer
+    )
+    cursor.execute(UPSERT_SQL)
+    results = cursor.fetchall()
+    inserted = sum(1 for _, is_insert in results if is_insert)
+    return [product_id for product_id, _ in results], inserted
+
+def bulk_load_products(
+    db_engine: Engine,
+    file_path: str,
+    batch_size: int = BULK_LOAD_BATCH_SIZE,
+    on_changed: Optional[Callable[[List[int]], None]] = None
+) -> Dict[str, Any]:
+    """Stream a JSON or NDJSON catalog into products, upserting on link.
+
+    Rows are validated and buffered `batch_size` at a time, copied into a
+    temporary staging table with COPY and merged into products in one
+    statement per batch. Each batch commits on its own, so memory stays
+    bounded and a failure keeps the batches loaded before it.
+
+    COPY bypasses the ORM, so the product search hooks never see these
+    rows; `on_changed` receives the ids each committed batch inserted or
+    updated, for re-indexing them.
+    """
+    stats = {"read": 0, "inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0, "batches": 0}
+    started = time.perf_counter()
+
+    def report(final: bool = False):
+        elapsed = time.perf_counter() - started
+        rate = stats["read"] / elapsed if elapsed else 0.0
+        stats["elapsed_s"] = round(elapsed, 2)
+        stats["rows_per_s"] = round(rate, 1)
+        label = "Finished loading" if final else f"Batch {stats['batches']}:"
+        print(
+            f"{label} {stats['read']} read, {stats['inserted']} inserted, "
+            f"{stats['updated']} updated, {stats['unchanged']} unchanged, "
+            f"{stats['skipped']} skipped ({rate:.0f} rows/s)"
+        )
+
+    connection = db_engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(STAGING_DDL)
+        connection.commit()
+
+        def flush(batch: List[Tuple], first_seq: int):
+            changed, inserted = _copy_batch(cursor, batch, first_seq)
+            connection.commit()
+            updated = len(changed) - inserted
+            if on_changed is not None:
+                on_changed(changed)
+            stats["batches"] += 1
+            stats["inserted"] += inserted
+            stats["updated"] += updated
+            stats["unchanged"] += len(batch) - inserted - updated
+            report()
+
+        def malformed(error: json.JSONDecodeError):
+            stats["read"] += 1
+            stats["skipped"] += 1
+            if stats["skipped"] <= MAX_REPORTED_ERRORS:
+                print(f"Skipping malformed record: {str(error)}")
+
+        batch: List[Tuple] = []
+        with open(file_path, "r", encoding="utf-8-sig") as f:
+            for item in iter_json_records(f, on_error=malformed):
+                stats["read"] += 1
+                try:
+                    batch.append(to_row(item))
+                except Exception as e:
+                    stats["skipped"] += 1
+                    if stats["skipped"] <= MAX_REPORTED_ERRORS:
+                        name = item.get("product_name") if isinstance(item, dict) else None
+                        print(f"Skipping product {name!r}: {str(e)}")
+                    continue
+                if len(batch) >= batch_size:
+                    flush(batch, stats["read"] - len(batch))
+                    batch = []
+            if batch:
+                flush(batch, stats["read"] - len(batch))
+
+        cursor.execute("DROP TABLE IF EXISTS products_staging")
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    report(final=True)
+    return stats
+
+def seed_products(db_engine: Engine, file_path: str) -> Optional[Dict[str, Any]]:
+    """Load the catalog if the products table is empty; returns None if it wasn't.
+
+    The emptiness check and the load happen under the migration lock, so
+    when several workers start together exactly one of them seeds and the
+    rest find the rows already there.
+    """
+    with db_engine.connect() as connection, advisory_lock(connection, MIGRATION_LOCK_ID):
+        has_products = connection.execute(text("SELECT EXISTS (SELECT 1 FROM products)")).scalar()
+        connection.commit()
+        if has_products:
+            return None
+        return bulk_load_products(db_engine, file_path)
@@ -15,6 +15,27 @@ def extract_price_value(price_str: str) -> float:
         print(f"After cleaning: {numeric_str}")
         raise e
 
+# Brands whose name is more than the first word of the product name
+KNOWN_BRANDS = [
+    "IYKYK by Nykaa Fashion", "Nykaa Naturals", "Nykaa Fashion", "The Ordinary", "The Face Shop",
+    "The Derma Co", "Dot & Key", "Tom Ford", "Twenty Dresses", "Marc Loire", "House of Vian",
+    "Coral Haze", "Himalaya Herbals", "Lotus Professional", "Nature's Essence", "Lacto Calamine"
+]
+
+def extract_brand(product_name: str) -> str:
+    """Best-effort brand from a product name: a known brand prefix, else the first word"""
+    name = (product_name or "").strip()
+    lowered = name.lower()
+    for brand in sorted(KNOWN_BRANDS, key=len, reverse=True):
+        if lowered.startswith(brand.lower()):
+            return brand
+    words = name.split()
+    if not words:
+        return ""
+    if words[0].lower() == "the" and len(words) > 1:
+        return f"{words[0]} {words[1]}".rstrip(".")
+    return words[0].rstrip(".")
+
 def load_products(db: Session, file_path: str):
     """Load products from JSON file into database."""
     try:
@@ -26,6 +47,7 @@ def load_products(db: Session, file_path: str):
             try:
                 product = Product(
                     product_name=item['product_name'],
+                    brand=extract_brand(item['product_name']),
                     price=item['price'],
                     price_value=extract_price_value(item['price']),
                     rating=float(item['rating']),
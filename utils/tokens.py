@@ -0,0 +1,14 @@
+# utils/tokens.py
+import re
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens used by the local lexical scorers"""
+    return _WORD_RE.findall(text.lower())